@@ -0,0 +1,164 @@
+"""Admission control for camera frame analysis.
+
+Analysing a frame is the most expensive request an exam page makes, and a
+late frame is worth nothing, so a worker that falls behind turns frames away
+with 429 + Retry-After instead of letting them queue in front of submissions
+and logins:
+
+- at most FRAME_MAX_IN_FLIGHT frames are analysed at once per worker, and none
+  start while fewer than FRAME_RESERVED_SLOTS of its WORKER_THREADS are free;
+- each attempt gets at most one analysed frame per FRAME_MIN_INTERVAL_SECONDS,
+  claimed on its ExamAttempt row so the limit holds across workers.
+
+Every decision is counted; see FrameAdmission.metrics()."""
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import math
+import os
+import random
+import threading
+import time
+
+from flask import current_app, g, jsonify
+from sqlalchemy import or_, update
+
+from extensions import db
+from models import ExamAttempt
+
+class FrameAdmission:
+    """Per-worker request and frame accounting"""
+    def __init__(self, threads, max_in_flight, reserved_slots):
+        self.threads = threads
+        self.max_in_flight = max_in_flight
+        self.reserved_slots = reserved_slots
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._frames = 0
+        self._peak_frames = 0
+        self._decisions = Counter()
+        self._analysis_seconds = 0.0
+
+    def request_started(self):
+        with self._lock:
+            self._requests += 1
+
+    def request_finished(self):
+        with self._lock:
+            self._requests -= 1
+
+    def acquire(self):
+        """Take a frame slot. Returns None, or why the frame was refused."""
+        with self._lock:
+            if self._frames >= self.max_in_flight:
+                reason = 'busy'
+            elif self.threads - self._requests < self.reserved_slots:
+                # this request is already counted, so that is what stays free
+                reason = 'reserved'
+            else:
+                self._frames += 1
+                self._peak_frames = max(self._peak_frames, self._frames)
+                return None
+            self._decisions[f'shed_{reason}'] += 1
+            return reason
+
+    def release(self, seconds=None):
+        """Give the slot back; `seconds` is the analysis time if the frame was analysed"""
+        with self._lock:
+            self._frames -= 1
+            if seconds is not None:
+                self._decisions['analysed'] += 1
+                self._analysis_seconds += seconds
+
+    def record(self, decision):
+        with self._lock:
+            self._decisions[decision] += 1
+
+    def metrics(self):
+        with self._lock:
+            analysed = self._decisions['analysed']
+            return {
+                'pid': os.getpid(),
+                'threads': self.threads,
+                'max_frames_in_flight': self.max_in_flight,
+                'reserved_slots': self.reserved_slots,
+                'requests_in_flight': self._requests,
+                'frames_in_flight': self._frames,
+                'peak_frames_in_flight': self._peak_frames,
+                'decisions': dict(self._decisions),
+                'mean_analysis_ms': round(1000 * self._analysis_seconds / analysed, 1) if analysed else None,
+            }
+
+def get_frame_admission():
+    return current_app.extensions['frame_admission']
+
+def claim_frame_interval(attempt_id, student_id):
+    """Claim this attempt's next frame. False if its last analysed frame is
+    more recent than FRAME_MIN_INTERVAL_SECONDS."""
+    now = datetime.utcnow()
+    earliest = now - timedelta(seconds=current_app.config['FRAME_MIN_INTERVAL_SECONDS'])
+    claimed = db.session.execute(
+        update(ExamAttempt)
+        .where(ExamAttempt.id == attempt_id,
+               ExamAttempt.student_id == student_id,
+               or_(ExamAttempt.last_frame_at.is_(None), ExamAttempt.last_frame_at <= earliest))
+        .values(last_frame_at=now)
+    ).rowcount
+    db.session.commit()
+    return claimed == 1
+
+@contextmanager
+def frame_slot(attempt_id, student_id):
+    """Admit one frame: yields None if it may be analysed now, else why it
+    was refused. Call before reading the frame so shed frames cost little."""
+    admission = get_frame_admission()
+    refused = admission.acquire()
+    if refused:
+        yield refused
+        return
+    analysed_in = None
+    try:
+        if not claim_frame_interval(attempt_id, student_id):
+            admission.record('shed_rate')
+            yield 'rate'
+            return
+        started = time.perf_counter()
+        yield None
+        analysed_in = time.perf_counter() - started
+    finally:
+        admission.release(analysed_in)
+
+def shed_payload(reason):
+    """Why a frame was skipped and when to send the next one; overload hints
+    are jittered so pages don't retry in step"""
+    if reason == 'rate':
+        retry_after = math.ceil(current_app.config['FRAME_MIN_INTERVAL_SECONDS'])
+    else:
+        base = current_app.config['FRAME_RETRY_AFTER_SECONDS']
+        retry_after = base + random.randint(0, base)
+    return {'skipped': True, 'reason': reason, 'retry_after': retry_after}
+
+def frame_shed_response(reason):
+    """429 with Retry-After for a skipped frame"""
+    payload = shed_payload(reason)
+    response = jsonify(payload)
+    response.status_code = 429
+    response.headers['Retry-After'] = str(payload['retry_after'])
+    return response
+
+def _request_started():
+    get_frame_admission().request_started()
+    g.admission_counted = True
+
+def _request_finished(exc):
+    if g.pop('admission_counted', False):
+        get_frame_admission().request_finished()
+
+def init_admission(app):
+    app.extensions['frame_admission'] = FrameAdmission(
+        app.config['WORKER_THREADS'],
+        app.config['FRAME_MAX_IN_FLIGHT'],
+        app.config['FRAME_RESERVED_SLOTS']
+    )
+    app.before_request(_request_started)
+    app.teardown_request(_request_finished)
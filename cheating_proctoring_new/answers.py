@@ -0,0 +1,179 @@
+"""Stored answers: incremental autosave and grading from what is saved.
+
+Answers are upserted as the student works, so submitting an exam only has to
+mark the attempt complete and grade the rows that are already there."""
+from datetime import datetime
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from extensions import db
+from models import Answer, ExamAttempt, Question
+from violations import apply_violation_penalty, get_violation_store, ViolationCounts
+
+OPTIONS = ('A', 'B', 'C', 'D')
+
+def parse_answer_deltas(items, answer_key):
+    """{question_id: option or None} from request data, keeping only questions
+    on this exam. None clears a previous selection."""
+    deltas = {}
+    for item in items or []:
+        try:
+            question_id = int(item['question_id'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        selected_option = item.get('selected_option')
+        if question_id in answer_key and (selected_option is None or selected_option in OPTIONS):
+            deltas[question_id] = selected_option
+    return deltas
+
+def save_answers(attempt_id, deltas, answer_key):
+    """Upsert answer deltas for an attempt. Caller commits."""
+    cleared = [question_id for question_id, option in deltas.items() if option is None]
+    rows = [
+        {
+            'attempt_id': attempt_id,
+            'question_id': question_id,
+            'selected_option': option,
+            'is_correct': option == answer_key[question_id][0],
+        }
+        for question_id, option in deltas.items() if option is not None
+    ]
+    
+    if cleared:
+        db.session.execute(
+            delete(Answer).where(Answer.attempt_id == attempt_id, Answer.question_id.in_(cleared)),
+            execution_options={'synchronize_session': False}
+        )
+    if not rows:
+        return
+    
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        statement = dialect_insert(Answer).values(rows)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=['attempt_id', 'question_id'],
+            set_={
+                'selected_option': statement.excluded.selected_option,
+                'is_correct': statement.excluded.is_correct,
+            }
+        ))
+        return
+    
+    # Generic fallback: update what exists, insert the rest
+    existing = dict(db.session.execute(
+        select(Answer.question_id, Answer.id).where(
+            Answer.attempt_id == attempt_id,
+            Answer.question_id.in_([row['question_id'] for row in rows])
+        )
+    ).all())
+    updates = [dict(row, id=existing[row['question_id']]) for row in rows if row['question_id'] in existing]
+    inserts = [row for row in rows if row['question_id'] not in existing]
+    if updates:
+        db.session.execute(update(Answer), updates)
+    if inserts:
+        db.session.execute(insert(Answer), inserts)
+
+def saved_answers(attempt_id):
+    """{question_id: selected_option} for an attempt"""
+    return dict(db.session.execute(
+        select(Answer.question_id, Answer.selected_option).where(Answer.attempt_id == attempt_id)
+    ).all())
+
+def grade_attempts(attempt_ids):
+    """Refresh is_correct against the current answer key for several attempts
+    at once. Returns {attempt_id: raw marks}; attempts with nothing correct
+    are left out."""
+    correct_option = select(Question.correct_option).where(
+        Question.id == Answer.question_id
+    ).scalar_subquery()
+    db.session.execute(
+        update(Answer)
+        .where(Answer.attempt_id.in_(attempt_ids))
+        .values(is_correct=func.coalesce(Answer.selected_option == correct_option, False)),
+        execution_options={'synchronize_session': False}
+    )
+    return dict(db.session.execute(
+        select(Answer.attempt_id, func.sum(Question.marks))
+        .select_from(Answer)
+        .join(Question, Question.id == Answer.question_id)
+        .where(Answer.attempt_id.in_(attempt_ids), Answer.is_correct == True)
+        .group_by(Answer.attempt_id)
+    ).all())
+
+def grade_stored_answers(attempt_id):
+    """Refresh is_correct against the current answer key and return the raw marks"""
+    return grade_attempts([attempt_id]).get(attempt_id, 0)
+
+def finalize_attempt(attempt_id, end_time=None):
+    """Mark an attempt submitted, grade it from stored answers and apply the
+    violation penalty. Returns (final_marks, violation counts), or None if the
+    attempt was already submitted (the claim is a conditional UPDATE, so
+    concurrent callers can't both finalize it). Caller commits."""
+    claimed = db.session.execute(
+        update(ExamAttempt)
+        .where(ExamAttempt.id == attempt_id, ExamAttempt.submitted == False)
+        .values(submitted=True, end_time=end_time or datetime.utcnow()),
+        execution_options={'synchronize_session': False}
+    ).rowcount
+    if not claimed:
+        return None
+    
+    # Read after the claim, which holds the row, so no increment slips in
+    # between; the store keeps the counter columns itself
+    counts = get_violation_store().get(attempt_id)
+    final_marks = apply_violation_penalty(grade_stored_answers(attempt_id), counts.total)
+    values = {'final_marks': final_marks}
+    if counts.limit_reached:
+        values['terminated'] = True
+    db.session.execute(
+        update(ExamAttempt).where(ExamAttempt.id == attempt_id).values(**values),
+        execution_options={'synchronize_session': False}
+    )
+    return final_marks, counts
+
+def finalize_attempts(attempt_ids, end_time=None):
+    """finalize_attempt for many attempts in a few statements, using the
+    violation counts stored on each row. Attempts that are already submitted
+    are skipped. Returns {attempt_id: final_marks} for the attempts this call
+    claimed. Caller commits."""
+    claim = (
+        update(ExamAttempt)
+        .where(ExamAttempt.id.in_(attempt_ids), ExamAttempt.submitted == False)
+        .values(submitted=True, end_time=end_time or datetime.utcnow())
+    )
+    columns = (ExamAttempt.id, ExamAttempt.tab_switch_count, ExamAttempt.camera_warning_count)
+    if db.session.get_bind().dialect.name in ('sqlite', 'postgresql'):
+        claimed = db.session.execute(
+            claim.returning(*columns), execution_options={'synchronize_session': False}
+        ).all()
+    else:
+        # Generic fallback: lock the unsubmitted rows so a concurrent caller
+        # waits and then skips them, claim them, then read their counts back
+        attempt_ids = db.session.scalars(
+            select(ExamAttempt.id)
+            .where(ExamAttempt.id.in_(attempt_ids), ExamAttempt.submitted == False)
+            .with_for_update()
+        ).all()
+        claimed = []
+        if attempt_ids:
+            db.session.execute(
+                claim.where(ExamAttempt.id.in_(attempt_ids)),
+                execution_options={'synchronize_session': False}
+            )
+            claimed = db.session.execute(select(*columns).where(ExamAttempt.id.in_(attempt_ids))).all()
+    if not claimed:
+        return {}
+    
+    raw_marks = grade_attempts([row.id for row in claimed])
+    final_marks, values = {}, []
+    for attempt_id, tab_switches, camera_warnings in claimed:
+        counts = ViolationCounts(tab_switches or 0, camera_warnings or 0)
+        final_marks[attempt_id] = apply_violation_penalty(raw_marks.get(attempt_id, 0), counts.total)
+        row = {'id': attempt_id, 'final_marks': final_marks[attempt_id], 'cheating_count': counts.total}
+        if counts.limit_reached:
+            row['terminated'] = True
+        values.append(row)
+    db.session.execute(update(ExamAttempt), values)
+    return final_marks
@@ -0,0 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from functools import wraps
+import threading
+
+from flask import current_app, session, redirect, render_template, url_for, flash
+from werkzeug.security import check_password_hash
+
+from extensions import db
+
+# Login required decorator
+def login_required(role):
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not session.get(f'{role}_logged_in'):
+                flash(f'Please login as {role} to access this page.', 'warning')
+                return redirect(url_for(f'{role}.{role}_login'))
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+class LoginBusy(Exception):
+    """Raised when the password pool has no room for another check"""
+
+class PasswordVerifier:
+    """Runs check_password_hash on a bounded thread pool.
+
+    Hashing is the expensive part of a login. During an exam-start burst only
+    `workers` hashes run at once, at most `queue_limit` more wait for a slot,
+    and everything beyond that is turned away immediately instead of piling
+    up on the request threads."""
+    def __init__(self, workers, queue_limit, timeout):
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-check')
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+
+    def verify(self, password_hash, password):
+        if not self._slots.acquire(blocking=False):
+            raise LoginBusy()
+        try:
+            future = self._pool.submit(check_password_hash, password_hash, password)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise LoginBusy()
+
+def verify_password(password_hash, password):
+    # Don't hold a database connection while waiting for a hashing slot
+    db.session.close()
+    return current_app.extensions['password_verifier'].verify(password_hash, password)
+
+def login_busy_response(template):
+    """503 for a login that was shed by the password pool"""
+    retry_after = current_app.config['LOGIN_RETRY_AFTER_SECONDS']
+    flash(f'Too many people are logging in right now. Please try again in {retry_after} seconds.', 'warning')
+    response = current_app.make_response((render_template(template), 503))
+    response.headers['Retry-After'] = str(retry_after)
+    return response
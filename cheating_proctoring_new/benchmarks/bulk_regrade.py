@@ -0,0 +1,119 @@
+"""Time a whole-exam regrade after the answer key changes.
+
+    python benchmarks/bulk_regrade.py [--attempts 100000] [--questions 20]
+
+Seeds a throwaway SQLite database with submitted attempts and answers,
+flips the correct option of a few questions and times regrade.regrade_exam.
+A sample of attempts is then re-scored one by one with the per-attempt
+grading rules to check the vectorized result."""
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, update
+
+from app import create_app
+from extensions import db
+from models import User, Exam, Question, ExamAttempt, Answer
+from regrade import regrade_exam
+from seed import init_db
+from violations import apply_violation_penalty
+
+OPTIONS = 'ABCD'
+
+def seed(attempts, questions, rng):
+    exam = Exam(title='Regrade Benchmark', duration_minutes=60, total_questions=questions,
+                created_by=1, is_published=True)
+    db.session.add(exam)
+    db.session.flush()
+    db.session.execute(insert(Question), [
+        {'exam_id': exam.id, 'question_text': f'Q{i}', 'option_a': 'a', 'option_b': 'b',
+         'option_c': 'c', 'option_d': 'd', 'correct_option': 'A', 'marks': 1 + i % 2}
+        for i in range(questions)
+    ])
+    question_ids = [q.id for q in Question.query.filter_by(exam_id=exam.id).order_by(Question.id)]
+    
+    db.session.execute(insert(User), [
+        {'username': f'regrade{i:06d}', 'password_hash': '-', 'role': 'student', 'full_name': f'Student {i}'}
+        for i in range(attempts)
+    ])
+    student_ids = [row[0] for row in db.session.query(User.id).filter(User.username.like('regrade%'))]
+    db.session.execute(insert(ExamAttempt), [
+        {'exam_id': exam.id, 'student_id': student_id, 'submitted': True, 'final_marks': 0,
+         'cheating_count': rng.choice((0, 0, 0, 1, 2, 3))}
+        for student_id in student_ids
+    ])
+    attempt_ids = [row[0] for row in db.session.query(ExamAttempt.id).filter_by(exam_id=exam.id)]
+    
+    batch = []
+    for attempt_id in attempt_ids:
+        for question_id in question_ids:
+            if rng.random() < 0.95:
+                batch.append({'attempt_id': attempt_id, 'question_id': question_id,
+                              'selected_option': rng.choice(OPTIONS), 'is_correct': False})
+        if len(batch) >= 50000:
+            db.session.execute(insert(Answer), batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(Answer), batch)
+    db.session.commit()
+    return exam.id, question_ids, attempt_ids
+
+def expected_marks(attempt_id):
+    attempt = db.session.get(ExamAttempt, attempt_id)
+    total = 0
+    for answer in Answer.query.filter_by(attempt_id=attempt_id):
+        question = db.session.get(Question, answer.question_id)
+        if answer.selected_option == question.correct_option:
+            total += question.marks
+    return apply_violation_penalty(total, attempt.cheating_count)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--attempts', type=int, default=100000)
+    parser.add_argument('--questions', type=int, default=20)
+    parser.add_argument('--sample', type=int, default=200, help='attempts to cross-check one by one')
+    args = parser.parse_args()
+    rng = random.Random(7)
+    
+    db_path = os.path.join(tempfile.mkdtemp(), 'regrade.db')
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}'})
+    with app.app_context():
+        with contextlib.redirect_stdout(io.StringIO()):
+            init_db(reset=True)
+        
+        started = time.perf_counter()
+        exam_id, question_ids, attempt_ids = seed(args.attempts, args.questions, rng)
+        print(f"Seeded {len(attempt_ids)} attempts x {len(question_ids)} questions "
+              f"in {time.perf_counter() - started:.1f}s")
+        
+        first = regrade_exam(exam_id)
+        print(f"Initial grade:  {first['attempts']} attempts, {first['changed']} changed")
+        
+        # Fix the "wrong" key on a few questions
+        for question_id in question_ids[:3]:
+            db.session.execute(update(Question).where(Question.id == question_id).values(correct_option='C'))
+        db.session.commit()
+        
+        started = time.perf_counter()
+        result = regrade_exam(exam_id)
+        elapsed = time.perf_counter() - started
+        print(f"Regrade:        {result['attempts']} attempts, {result['changed']} changed, "
+              f"mean {result['mean_before']:.2f} -> {result['mean_after']:.2f} in {elapsed:.2f}s")
+        
+        mismatches = 0
+        for attempt_id in rng.sample(attempt_ids, min(args.sample, len(attempt_ids))):
+            attempt = db.session.get(ExamAttempt, attempt_id)
+            if abs(attempt.final_marks - expected_marks(attempt_id)) > 1e-9:
+                mismatches += 1
+        print(f"Cross-check:    {mismatches} mismatches in {min(args.sample, len(attempt_ids))} sampled attempts")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Simulate the start of a scheduled exam: every student logs in, opens the
+exam and fetches its questions at the same moment.
+
+    python benchmarks/exam_start_load.py [--students 1000] [--no-provision]
+        [--queue-limit N] [--check-timeout SECONDS]
+
+Runs against an in-process app on a throwaway SQLite database with the app's
+own login admission settings (PASSWORD_QUEUE_LIMIT, PASSWORD_CHECK_TIMEOUT)
+unless overridden, and reports p50/p95/p99 latency for each step and for the
+whole sequence next to the share of logins shed with a 503."""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.security import generate_password_hash
+
+from app import create_app
+from config import Config
+from extensions import db
+from models import User, Exam, Question
+from provisioning import provision_exam
+from seed import init_db
+
+PASSWORD = 'load-test'
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def build_app(students, provision, queue_limit, check_timeout):
+    db_path = os.path.join(tempfile.mkdtemp(), 'load.db')
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'SQLALCHEMY_ENGINE_OPTIONS': {
+            'connect_args': {'timeout': 60, 'check_same_thread': False},
+            'pool_size': 20, 'max_overflow': 100, 'pool_timeout': 120,
+        },
+        'PASSWORD_QUEUE_LIMIT': queue_limit,
+        'PASSWORD_CHECK_TIMEOUT': check_timeout,
+    })
+    with app.app_context(), contextlib.redirect_stdout(io.StringIO()):
+        init_db(reset=True)
+        # One hash shared by every load-test account keeps setup fast while
+        # each login still pays for a full check_password_hash
+        password_hash = generate_password_hash(PASSWORD)
+        db.session.add_all([
+            User(username=f'load{i:05d}', password_hash=password_hash,
+                 role='student', full_name=f'Load Student {i}')
+            for i in range(students)
+        ])
+        exam = Exam(title='Load Test Exam', duration_minutes=60, total_questions=20,
+                    created_by=1, is_published=True,
+                    starts_at=datetime.utcnow() + timedelta(seconds=2))
+        db.session.add(exam)
+        db.session.flush()
+        db.session.add_all([
+            Question(exam_id=exam.id, question_text=f'Question {n}', option_a='A',
+                     option_b='B', option_c='C', option_d='D', correct_option='A')
+            for n in range(20)
+        ])
+        db.session.commit()
+        if provision:
+            provision_exam(exam)
+        exam_id = exam.id
+        opens_at = exam.starts_at
+    while datetime.utcnow() < opens_at:
+        time.sleep(0.05)
+    return app, exam_id
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--students', type=int, default=1000)
+    parser.add_argument('--no-provision', action='store_true',
+                        help='skip pre-creating attempts (baseline)')
+    parser.add_argument('--queue-limit', type=int, default=Config.PASSWORD_QUEUE_LIMIT,
+                        help='PASSWORD_QUEUE_LIMIT for the run (default: %(default)s)')
+    parser.add_argument('--check-timeout', type=float, default=Config.PASSWORD_CHECK_TIMEOUT,
+                        help='PASSWORD_CHECK_TIMEOUT in seconds (default: %(default)s)')
+    args = parser.parse_args()
+    
+    app, exam_id = build_app(args.students, not args.no_provision, args.queue_limit, args.check_timeout)
+    timings = {'login': [], 'start_exam': [], 'questions': [], 'total': []}
+    shed = []
+    errors = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(args.students)
+    
+    def student(i):
+        client = app.test_client()
+        barrier.wait()
+        began = time.perf_counter()
+        response = client.post('/student/login', data={'username': f'load{i:05d}', 'password': PASSWORD})
+        logged_in = time.perf_counter()
+        if response.status_code == 503:
+            with lock:
+                shed.append(i)
+            return
+        started = client.get(f'/student/start_exam/{exam_id}')
+        opened = time.perf_counter()
+        questions = client.get(f'/api/exam/questions/{exam_id}')
+        done = time.perf_counter()
+        with lock:
+            if started.status_code != 200 or questions.status_code != 200:
+                errors.append(i)
+                return
+            timings['login'].append(logged_in - began)
+            timings['start_exam'].append(opened - logged_in)
+            timings['questions'].append(done - opened)
+            timings['total'].append(done - began)
+    
+    threading.stack_size(512 * 1024)
+    threads = [threading.Thread(target=student, args=(i,)) for i in range(args.students)]
+    wall = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall
+    
+    print(f"students: {args.students}  provisioned: {not args.no_provision}  "
+          f"queue limit: {args.queue_limit}  check timeout: {args.check_timeout:g} s  wall: {wall:.1f} s")
+    shed_rate = 100 * len(shed) / args.students
+    print(f"completed: {len(timings['total'])}  shed (503): {len(shed)} ({shed_rate:.1f}%)  errors: {len(errors)}")
+    for step, values in timings.items():
+        ms = [v * 1000 for v in values]
+        print(f"{step:>10}: p50 {percentile(ms, 50):8.1f} ms  p95 {percentile(ms, 95):8.1f} ms  "
+              f"p99 {percentile(ms, 99):8.1f} ms  mean {statistics.mean(ms) if ms else 0:8.1f} ms"
+              + (f"  503: {shed_rate:.1f}%" if step == 'login' else ''))
+
+if __name__ == '__main__':
+    main()
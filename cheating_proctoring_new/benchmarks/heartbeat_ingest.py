@@ -0,0 +1,88 @@
+"""Compare per-tick ingest cost of full frame uploads and heartbeats.
+
+    python benchmarks/heartbeat_ingest.py [--ticks 200]
+
+Uses a synthetic 320x240 camera frame (the exam page's capture size) with a
+single centered face-like blob, against an in-process app. Heartbeat cost
+includes the audited full-frame uploads at HEARTBEAT_AUDIT_RATE."""
+import argparse
+import base64
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+import numpy as np
+
+from app import create_app
+from seed import init_db
+
+def synthetic_frame():
+    rng = np.random.default_rng(0)
+    image = rng.integers(60, 200, (240, 320, 3), dtype=np.uint8)
+    cv2.ellipse(image, (160, 120), (55, 70), 0, 0, 360, (180, 200, 230), -1)
+    ok, jpeg = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 70])
+    return 'data:image/jpeg;base64,' + base64.b64encode(jpeg.tobytes()).decode()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ticks', type=int, default=200)
+    args = parser.parse_args()
+    
+    # One client sends back to back: no per-attempt frame interval or load shedding
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}",
+        'FRAME_MIN_INTERVAL_SECONDS': 0,
+        'FRAME_MAX_IN_FLIGHT': 1000,
+        'FRAME_RESERVED_SLOTS': 0,
+    })
+    with app.app_context(), contextlib.redirect_stdout(io.StringIO()):
+        init_db(reset=True)
+    client = app.test_client()
+    client.post('/student/login', data={'username': '50001', 'password': '50001@123'})
+    client.get('/student/start_exam/1')
+    client.post('/api/start_camera_proctoring')
+    
+    def post(url, payload):
+        response = client.post(url, json=payload)
+        # A rejected request would make the tick look cheap
+        assert response.status_code == 200, (url, response.status_code, response.get_data(as_text=True))
+        return response
+    
+    frame = {'image_data': synthetic_frame(), 'timestamp': 0}
+    heartbeat = {'face_count': 1, 'boxes': [[105, 50, 110, 140]], 'frame_width': 320,
+                 'frame_height': 240, 'frame_hash': '', 'timestamp': 0}
+    
+    results = {}
+    for name, url, payload in [('frame upload', '/api/process_camera_frame', frame),
+                               ('heartbeat', '/api/proctoring/heartbeat', heartbeat)]:
+        body = len(json.dumps(payload))
+        uploads = 0
+        started = time.perf_counter()
+        for tick in range(args.ticks):
+            if url.endswith('heartbeat'):
+                payload['frame_hash'] = f'{tick:016x}'
+                if post(url, payload).json['upload_frame']:
+                    uploads += 1
+                    post('/api/process_camera_frame', frame)
+            else:
+                post(url, payload)
+        elapsed = time.perf_counter() - started
+        frame_body = len(json.dumps(frame))
+        total_bytes = body * args.ticks + (uploads * frame_body if url.endswith('heartbeat') else 0)
+        results[name] = (elapsed / args.ticks * 1000, total_bytes / args.ticks)
+        print(f"{name:>13}: {results[name][0]:7.2f} ms/tick  {results[name][1]:9.0f} bytes/tick"
+              + (f"  ({uploads} audited uploads)" if url.endswith('heartbeat') else ''))
+    
+    frame_ms, frame_bytes = results['frame upload']
+    beat_ms, beat_bytes = results['heartbeat']
+    print(f"reduction: {frame_ms / beat_ms:.1f}x server time, {frame_bytes / beat_bytes:.1f}x bytes")
+
+if __name__ == '__main__':
+    main()
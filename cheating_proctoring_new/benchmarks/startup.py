@@ -0,0 +1,56 @@
+"""Measure how long a fresh process takes to build the app.
+
+    python benchmarks/startup.py [--runs N]
+
+Each run starts a new interpreter, so the timings include every import
+create_app() pulls in. The script also reports whether OpenCV got imported
+(it should not be) and what preloading the detectors costs a worker."""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+created = time.perf_counter()
+cv2_loaded = 'cv2' in sys.modules
+from detection import preload_detectors
+preload_detectors()
+preloaded = time.perf_counter()
+print(json.dumps({
+    'create_app_ms': (created - start) * 1000,
+    'preload_ms': (preloaded - created) * 1000,
+    'cv2_loaded': cv2_loaded,
+}))
+'''
+
+def run_once():
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE], cwd=APP_DIR,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+    
+    results = [run_once() for _ in range(args.runs)]
+    create_ms = [r['create_app_ms'] for r in results]
+    preload_ms = [r['preload_ms'] for r in results]
+    
+    print(f"runs: {args.runs}")
+    print(f"create_app: median {statistics.median(create_ms):.1f} ms, max {max(create_ms):.1f} ms")
+    print(f"preload_detectors: median {statistics.median(preload_ms):.1f} ms")
+    print(f"cv2 imported by create_app: {any(r['cv2_loaded'] for r in results)}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""Admin portal: system overview, users, exams and reports"""
+from flask import Blueprint, render_template, jsonify, session, redirect, request, flash
+
+from admission import get_frame_admission
+from auth import login_required, verify_password, login_busy_response, LoginBusy
+from dashboards import admin_counters, admin_recent_activity, panel_response, PANEL_CACHE_CONTROL
+from http_policy import cache_policy
+from models import User, Exam, ExamAttempt
+
+admin_bp = Blueprint('admin', __name__)
+
+@admin_bp.route('/admin/login', methods=['GET', 'POST'])
+def admin_login():
+    if request.method == 'POST':
+        username = request.form['username']
+        password = request.form['password']
+        user = User.query.filter_by(username=username, role='admin').first()
+        
+        try:
+            valid = user is not None and verify_password(user.password_hash, password)
+        except LoginBusy:
+            return login_busy_response('admin_login.html')
+        
+        if valid:
+            session['admin_logged_in'] = True
+            session['admin_id'] = user.id
+            session['admin_name'] = user.full_name
+            flash('Admin login successful!', 'success')
+            return redirect('/admin/dashboard')
+        flash('Invalid credentials!', 'danger')
+    return render_template('admin_login.html')
+
+@admin_bp.route('/admin/dashboard')
+@login_required('admin')
+def admin_dashboard():
+    # First paint uses the same panels the page then refreshes in place
+    return render_template('admin_dashboard.html',
+                         counters=admin_counters(),
+                         activity=admin_recent_activity(),
+                         admin_name=session.get('admin_name'))
+
+@admin_bp.route('/admin/api/panels/counters')
+@login_required('admin')
+@cache_policy(PANEL_CACHE_CONTROL)
+def admin_counters_panel():
+    return panel_response(admin_counters())
+
+@admin_bp.route('/admin/api/panels/recent_activity')
+@login_required('admin')
+@cache_policy(PANEL_CACHE_CONTROL)
+def admin_recent_activity_panel():
+    return panel_response(admin_recent_activity())
+
+@admin_bp.route('/admin/api/metrics/frames')
+@login_required('admin')
+def frame_admission_metrics():
+    """Camera frame admission decisions of the worker that answers"""
+    return jsonify(get_frame_admission().metrics())
+
+@admin_bp.route('/admin/users')
+@login_required('admin')
+def admin_users():
+    students = User.query.filter_by(role='student').all()
+    teachers = User.query.filter_by(role='teacher').all()
+    
+    return render_template('admin_users.html',
+                         students=students,
+                         teachers=teachers,
+                         admin_name=session.get('admin_name'))
+
+@admin_bp.route('/admin/exams')
+@login_required('admin')
+def admin_exams():
+    exams = Exam.query.all()
+    return render_template('admin_exams.html',
+                         exams=exams,
+                         admin_name=session.get('admin_name'))
+
+@admin_bp.route('/admin/reports')
+@login_required('admin')
+def admin_reports():
+    # Get comprehensive reports
+    exam_results = []
+    exams = Exam.query.all()
+    
+    for exam in exams:
+        attempts = ExamAttempt.query.filter_by(exam_id=exam.id, submitted=True).all()
+        if attempts:
+            avg_score = sum(attempt.final_marks for attempt in attempts) / len(attempts)
+            pass_rate = len([a for a in attempts if a.final_marks >= exam.total_questions * 0.4]) / len(attempts) * 100
+            cheating_count = len([a for a in attempts if a.cheating_count > 0])
+            
+            exam_results.append({
+                'exam': exam,
+                'total_attempts': len(attempts),
+                'avg_score': avg_score,
+                'pass_rate': pass_rate,
+                'cheating_count': cheating_count
+            })
+    
+    return render_template('admin_reports.html',
+                         exam_results=exam_results,
+                         admin_name=session.get('admin_name'))
+
+@admin_bp.route('/admin/settings')
+@login_required('admin')
+def admin_settings():
+    return render_template('admin_settings.html',
+                         admin_name=session.get('admin_name'))
+
+@admin_bp.route('/admin/logout')
+def admin_logout():
+    session.clear()
+    flash('Admin logged out successfully!', 'info')
+    return redirect('/')
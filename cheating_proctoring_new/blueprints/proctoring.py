@@ -0,0 +1,297 @@
+"""Camera proctoring API. Detection itself lives in detection.py, which
+imports OpenCV/NumPy on first use so the rest of the app starts without them."""
+import random
+from datetime import datetime, timedelta
+
+from flask import Blueprint, current_app, jsonify, session, request
+from sqlalchemy import case, update
+
+from admission import frame_slot, frame_shed_response, shed_payload
+from answers import parse_answer_deltas, save_answers
+from auth import login_required
+from detection import decode_frame, analyze_camera_frame, evaluate_faces
+from extensions import db
+from models import Exam, ExamAttempt, CheatingLog, CameraLog
+from questions import get_answer_key
+from rollups import record_violation, CAMERA, CHEATING
+from violations import get_violation_store, record_focus_violation, MAX_VIOLATIONS
+
+proctoring_bp = Blueprint('proctoring', __name__)
+
+# Heartbeats claiming more faces than this are rejected (the page asks its
+# detector for at most 5)
+MAX_HEARTBEAT_FACES = 10
+
+@proctoring_bp.route('/api/start_camera_proctoring', methods=['POST'])
+@login_required('student')
+def start_camera_proctoring():
+    """Initialize camera proctoring for an exam attempt"""
+    attempt_id = session.get('current_attempt_id')
+    student_id = session['student_id']
+    
+    if not attempt_id:
+        return jsonify({'error': 'No active exam'}), 400
+    
+    # Initialize camera monitoring session
+    session['camera_proctoring'] = True
+    
+    return jsonify({
+        'status': 'started',
+        'message': 'Camera proctoring initialized'
+    })
+
+@proctoring_bp.route('/api/process_camera_frame', methods=['POST'])
+@login_required('student')
+def process_camera_frame():
+    """Process camera frame for AI proctoring"""
+    attempt_id = session.get('current_attempt_id')
+    student_id = session['student_id']
+    
+    if not attempt_id or not session.get('camera_proctoring'):
+        return jsonify({'error': 'Camera proctoring not active'}), 400
+    
+    # Shed the frame before reading its body if this worker is behind
+    with frame_slot(attempt_id, student_id) as refused:
+        if refused:
+            return frame_shed_response(refused)
+        payload, status = analyse_frame(student_id, attempt_id, request.json)
+    return jsonify(payload), status
+
+def analyse_frame(student_id, attempt_id, data):
+    """Decode, analyse and score one uploaded frame. Returns (payload, status)."""
+    image_data = data.get('image_data')
+    
+    # Decode base64 image
+    try:
+        # Remove header from base64 string
+        if ',' in image_data:
+            image_data = image_data.split(',')[1]
+        
+        image = decode_frame(image_data)
+        
+        if image is None:
+            return {'error': 'Invalid image data'}, 400
+        
+        # AI Proctoring Analysis
+        analysis_result = analyze_camera_frame(image, current_app.config['FACE_DETECTION'])
+        
+        # Handle violations
+        if analysis_result['violation_detected']:
+            counts = handle_camera_violation(
+                student_id, 
+                attempt_id, 
+                analysis_result['violation_type'],
+                analysis_result['confidence'],
+                image_data
+            )
+            
+            return {
+                'violation': True,
+                'violation_type': analysis_result['violation_type'],
+                'warning_count': counts.camera_warnings,
+                'terminated': counts.limit_reached,
+                'message': analysis_result['message']
+            }, 200
+        
+        return {
+            'violation': False,
+            'status': 'normal'
+        }, 200
+        
+    except Exception as e:
+        print(f"Error processing camera frame: {e}")
+        return {'error': 'Frame processing failed'}, 500
+
+@proctoring_bp.route('/api/proctoring/heartbeat', methods=['POST'])
+@login_required('student')
+def proctoring_heartbeat():
+    """Lightweight presence check from the in-page face detector.
+    
+    The browser sends a summary of what it saw instead of a JPEG. The summary is
+    never counted as a violation on its own (the client can't be trusted); it only
+    decides whether to ask for a full frame, which /api/process_camera_frame then
+    analyses and scores as usual."""
+    attempt_id = session.get('current_attempt_id')
+    student_id = session['student_id']
+    
+    if not attempt_id or not session.get('camera_proctoring'):
+        return jsonify({'error': 'Camera proctoring not active'}), 400
+    
+    try:
+        result = evaluate_heartbeat(attempt_id, student_id, request.json or {})
+    except ValueError:
+        return jsonify({'error': 'Invalid heartbeat'}), 400
+    db.session.commit()
+    if result is None:
+        return jsonify({'error': 'Invalid attempt'}), 400
+    return jsonify(result)
+
+def evaluate_heartbeat(attempt_id, student_id, data):
+    """Record presence and decide whether to ask for a full frame. Returns
+    None for an attempt that isn't the student's open one; raises ValueError
+    for a malformed heartbeat. Caller commits."""
+    try:
+        face_count = int(data['face_count'])
+        width = int(data['frame_width'])
+        height = int(data['frame_height'])
+        boxes = [tuple(float(v) for v in box) for box in data.get('boxes', [])[:face_count]]
+        frame_hash = str(data.get('frame_hash', ''))[:64]
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('Invalid heartbeat')
+    if not 0 <= face_count <= MAX_HEARTBEAT_FACES or width <= 0 or height <= 0 or any(len(box) != 4 for box in boxes):
+        raise ValueError('Invalid heartbeat')
+    
+    # Record presence; count how many heartbeats in a row carried the same frame
+    repeated = db.session.execute(
+        update(ExamAttempt)
+        .where(ExamAttempt.id == attempt_id,
+               ExamAttempt.student_id == student_id,
+               ExamAttempt.submitted == False)
+        .values(
+            last_seen_at=datetime.utcnow(),
+            last_frame_hash=frame_hash,
+            repeated_frame_count=case(
+                (ExamAttempt.last_frame_hash == frame_hash, ExamAttempt.repeated_frame_count + 1),
+                else_=0
+            )
+        )
+        .returning(ExamAttempt.repeated_frame_count)
+    ).scalar()
+    if repeated is None:
+        return None
+    
+    # Same rules as the server-side detector. Some browser detectors only
+    # report a count; a single face without a box is taken as present.
+    if face_count == 1 and not boxes:
+        summary = {'violation_detected': False, 'violation_type': None}
+    else:
+        faces = boxes if len(boxes) == face_count else [None] * face_count
+        summary = evaluate_faces(faces, width, height, current_app.config['FACE_DETECTION'])
+    
+    reason = None
+    if summary['violation_detected']:
+        reason = summary['violation_type']
+    elif frame_hash and repeated >= current_app.config['HEARTBEAT_MAX_REPEATED_FRAMES']:
+        # A camera feed never produces identical frames for long
+        reason = 'frozen_frame'
+    elif random.random() < current_app.config['HEARTBEAT_AUDIT_RATE']:
+        reason = 'audit'
+    
+    return {
+        'status': 'ok',
+        'upload_frame': reason is not None,
+        'reason': reason
+    }
+
+@proctoring_bp.route('/api/exam/sync', methods=['POST'])
+@login_required('student')
+def exam_sync():
+    """One request per tick for everything the exam page reports.
+    
+    The page batches answer deltas, focus events, its heartbeat and, when one
+    is due, a camera frame. Answers, events and presence are written in a
+    single transaction; the frame then goes through the same admission control
+    as /api/process_camera_frame. The response has a result per part, plus the
+    time left by the server's clock."""
+    attempt_id = session.get('current_attempt_id')
+    student_id = session['student_id']
+    
+    attempt = ExamAttempt.query.get(attempt_id) if attempt_id else None
+    if not attempt or attempt.student_id != student_id:
+        return jsonify({'error': 'No active exam'}), 400
+    if attempt.submitted:
+        return jsonify({'error': 'Exam already submitted', 'submitted': True}), 409
+    
+    data = request.json or {}
+    exam = Exam.query.get(attempt.exam_id)
+    camera_active = session.get('camera_proctoring')
+    result = {}
+    
+    if not attempt.terminated:
+        answer_key = get_answer_key(exam)
+        deltas = parse_answer_deltas(data.get('answers'), answer_key)
+        save_answers(attempt.id, deltas, answer_key)
+        result['answers'] = {'saved': len(deltas)}
+        
+        # Nothing past the violation limit can change the outcome
+        events = [event for event in (data.get('events') or [])[:MAX_VIOLATIONS] if isinstance(event, dict)]
+        recorded = 0
+        for event in events:
+            counts = record_focus_violation(attempt, str(event.get('type') or 'tab_switch')[:50])
+            recorded += 1
+            if counts.limit_reached:
+                break
+        if recorded:
+            result['events'] = {
+                'recorded': recorded,
+                'cheating_count': counts.tab_switches,
+                'terminated': counts.limit_reached
+            }
+    
+    if camera_active and data.get('heartbeat'):
+        try:
+            result['heartbeat'] = evaluate_heartbeat(attempt.id, student_id, data['heartbeat'])
+        except ValueError:
+            result['heartbeat'] = {'error': 'Invalid heartbeat'}
+    
+    db.session.commit()
+    
+    frame = data.get('frame')
+    if camera_active and isinstance(frame, dict) and not attempt.terminated:
+        with frame_slot(attempt.id, student_id) as refused:
+            if refused:
+                result['frame'] = shed_payload(refused)
+            else:
+                result['frame'], _ = analyse_frame(student_id, attempt.id, frame)
+    
+    # A camera violation may have terminated the attempt since it was loaded
+    db.session.refresh(attempt)
+    result['terminated'] = attempt.terminated
+    if attempt.start_time:
+        deadline = attempt.start_time + timedelta(minutes=exam.duration_minutes)
+        result['remaining_seconds'] = max(0, int((deadline - datetime.utcnow()).total_seconds()))
+    return jsonify(result)
+
+def handle_camera_violation(student_id, attempt_id, violation_type, confidence, image_data):
+    """Handle camera proctoring violations"""
+    # Update warning count
+    counts = get_violation_store().increment(attempt_id, 'camera')
+    
+    # Log the violation
+    camera_log = CameraLog(
+        student_id=student_id,
+        exam_id=session.get('current_exam_id'),
+        attempt_id=attempt_id,
+        event_type=violation_type,
+        confidence=confidence,
+        image_data=image_data,
+        timestamp=datetime.utcnow()
+    )
+    db.session.add(camera_log)
+    record_violation(camera_log.exam_id, CAMERA, violation_type, camera_log.timestamp)
+    db.session.commit()
+    
+    # Only the violation that reached the limit triggers termination
+    if counts.crossed_limit:
+        terminate_exam_due_to_camera_violations(attempt_id)
+    
+    return counts
+
+def terminate_exam_due_to_camera_violations(attempt_id):
+    """Terminate exam due to excessive camera violations"""
+    attempt = ExamAttempt.query.get(attempt_id)
+    if attempt and not attempt.terminated:
+        attempt.terminated = True
+        db.session.commit()
+        
+        # Also log as cheating event
+        cheat_log = CheatingLog(
+            student_id=attempt.student_id,
+            exam_id=attempt.exam_id,
+            attempt_id=attempt_id,
+            cheat_type='camera_violations',
+            timestamp=datetime.utcnow()
+        )
+        db.session.add(cheat_log)
+        record_violation(attempt.exam_id, CHEATING, cheat_log.cheat_type, cheat_log.timestamp)
+        db.session.commit()
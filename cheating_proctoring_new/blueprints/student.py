@@ -0,0 +1,231 @@
+"""Student portal: login, taking exams and results"""
+from datetime import datetime
+
+from flask import Blueprint, render_template, jsonify, session, redirect, request, flash
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from answers import parse_answer_deltas, save_answers, saved_answers, finalize_attempt
+from auth import login_required, verify_password, login_busy_response, LoginBusy
+from dashboards import (student_result_rows, panel_response, invalidate_dashboards, student_scope,
+                        OVERVIEW, PANEL_CACHE_CONTROL)
+from extensions import db
+from http_policy import cache_policy
+from models import User, Exam, ExamAttempt
+from questions import get_question_payload, get_answer_key
+from violations import get_violation_store, record_focus_violation
+
+student_bp = Blueprint('student', __name__)
+
+@student_bp.route('/student/login', methods=['GET', 'POST'])
+def student_login():
+    if request.method == 'POST':
+        username = request.form['username']
+        password = request.form['password']
+        user = User.query.filter_by(username=username, role='student').first()
+        
+        try:
+            valid = user is not None and verify_password(user.password_hash, password)
+        except LoginBusy:
+            return login_busy_response('student_login.html')
+        
+        if valid:
+            session['student_logged_in'] = True
+            session['student_id'] = user.id
+            session['student_username'] = user.username
+            session['student_name'] = user.full_name
+            flash(f'Welcome {user.full_name}!', 'success')
+            return redirect('/student/dashboard')
+        flash('Invalid credentials!', 'danger')
+    return render_template('student_login.html')
+
+@student_bp.route('/student/dashboard')
+@login_required('student')
+def student_dashboard():
+    exams = Exam.query.filter_by(is_published=True).all()
+    student_id = session['student_id']
+    
+    # Get attempt history (pre-provisioned attempts haven't started yet)
+    attempts = ExamAttempt.query.filter(
+        ExamAttempt.student_id == student_id, ExamAttempt.start_time.isnot(None)
+    ).all()
+    
+    return render_template('student_dashboard.html', 
+                         exams=exams, 
+                         attempts=attempts,
+                         student_name=session['student_name'])
+
+@student_bp.route('/student/start_exam/<int:exam_id>')
+@login_required('student')
+def start_exam(exam_id):
+    exam = Exam.query.get_or_404(exam_id)
+    student_id = session['student_id']
+    
+    if exam.starts_at and datetime.utcnow() < exam.starts_at:
+        flash(f'This exam opens at {exam.starts_at.strftime("%Y-%m-%d %H:%M")} UTC.', 'warning')
+        return redirect('/student/dashboard')
+    
+    # Check if already attempted (scheduled exams have one pre-provisioned)
+    existing_attempt = ExamAttempt.query.filter_by(
+        exam_id=exam_id, student_id=student_id
+    ).first()
+    
+    if existing_attempt and existing_attempt.submitted:
+        flash('You have already taken this exam!', 'warning')
+        return redirect('/student/dashboard')
+    
+    # Create new attempt
+    if not existing_attempt:
+        attempt = ExamAttempt(
+            exam_id=exam_id,
+            student_id=student_id,
+            start_time=datetime.utcnow()
+        )
+        db.session.add(attempt)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent request (double click, second tab) created it first
+            db.session.rollback()
+            attempt = ExamAttempt.query.filter_by(exam_id=exam_id, student_id=student_id).first()
+        session['current_attempt_id'] = attempt.id
+    else:
+        if existing_attempt.start_time is None:
+            # Pre-provisioned attempt: claim it with a single-row update
+            db.session.execute(
+                update(ExamAttempt)
+                .where(ExamAttempt.id == existing_attempt.id, ExamAttempt.start_time.is_(None))
+                .values(start_time=datetime.utcnow())
+            )
+            db.session.commit()
+        session['current_attempt_id'] = existing_attempt.id
+    
+    session['current_exam_id'] = exam_id
+    session['exam_start_time'] = datetime.utcnow().isoformat()
+    
+    return render_template('exam_page.html', exam=exam, attempt_id=session['current_attempt_id'])
+
+@student_bp.route('/api/exam/questions/<int:exam_id>')
+@login_required('student')
+def get_exam_questions(exam_id):
+    exam = Exam.query.get_or_404(exam_id)
+    return jsonify({'questions': get_question_payload(exam)})
+
+def _current_attempt():
+    """The logged-in student's active attempt, or None"""
+    attempt_id = session.get('current_attempt_id')
+    if not attempt_id:
+        return None
+    attempt = ExamAttempt.query.get(attempt_id)
+    if not attempt or attempt.student_id != session['student_id']:
+        return None
+    return attempt
+
+@student_bp.route('/api/autosave', methods=['GET', 'POST'])
+@login_required('student')
+def autosave_answers():
+    """POST upserts answer deltas as the student works; GET returns what is
+    saved so the exam page can restore answers after a reload or crash."""
+    attempt = _current_attempt()
+    if not attempt:
+        return jsonify({'error': 'No active exam'}), 400
+    
+    if request.method == 'GET':
+        return jsonify({'answers': saved_answers(attempt.id)})
+    
+    if attempt.submitted or attempt.terminated:
+        return jsonify({'error': 'Exam is no longer accepting answers'}), 409
+    
+    answer_key = get_answer_key(Exam.query.get(attempt.exam_id))
+    deltas = parse_answer_deltas((request.json or {}).get('answers'), answer_key)
+    save_answers(attempt.id, deltas, answer_key)
+    db.session.commit()
+    
+    return jsonify({'success': True, 'saved': len(deltas)})
+
+@student_bp.route('/api/submit_exam', methods=['POST'])
+@login_required('student')
+def submit_exam():
+    data = request.json or {}
+    
+    if not session.get('current_attempt_id'):
+        return jsonify({'error': 'No active exam'}), 400
+    attempt = _current_attempt()
+    if not attempt:
+        return jsonify({'error': 'Invalid attempt'}), 400
+    attempt_id = attempt.id
+    
+    # Answers still pending on the client arrive as a last delta; everything
+    # else was autosaved already
+    answer_key = get_answer_key(Exam.query.get(attempt.exam_id))
+    save_answers(attempt_id, parse_answer_deltas(data.get('answers'), answer_key), answer_key)
+    
+    # Grade from stored answers and apply the combined violation penalty
+    finalized = finalize_attempt(attempt_id)
+    if finalized is None:
+        db.session.rollback()
+        return jsonify({'error': 'Exam already submitted'}), 409
+    total_marks, counts = finalized
+    
+    db.session.commit()
+    get_violation_store().discard(attempt_id)
+    invalidate_dashboards(OVERVIEW, student_scope(attempt.student_id))
+    
+    # Clear session
+    session.pop('current_attempt_id', None)
+    session.pop('current_exam_id', None)
+    session.pop('camera_proctoring', None)
+    
+    return jsonify({
+        'success': True,
+        'marks': total_marks,
+        'cheating_count': counts.tab_switches,
+        'camera_warnings': counts.camera_warnings,
+        'terminated': ExamAttempt.query.get(attempt_id).terminated
+    })
+
+@student_bp.route('/api/record_cheating', methods=['POST'])
+@login_required('student')
+def record_cheating():
+    data = request.json
+    attempt_id = session.get('current_attempt_id')
+    student_id = session['student_id']
+    
+    if not attempt_id:
+        return jsonify({'error': 'No active exam'}), 400
+    
+    attempt = ExamAttempt.query.get(attempt_id)
+    if not attempt or attempt.student_id != student_id:
+        return jsonify({'error': 'Invalid attempt'}), 400
+    
+    # Count and log it; terminates at 3+ total violations (cheating + camera)
+    counts = record_focus_violation(attempt, str(data.get('type') or 'tab_switch')[:50])
+    db.session.commit()
+    
+    if counts.limit_reached:
+        return jsonify({
+            'terminated': True,
+            'message': 'Exam terminated due to multiple violations!'
+        })
+    
+    return jsonify({
+        'cheating_count': counts.tab_switches,
+        'warning': True if counts.tab_switches >= 1 else False
+    })
+
+@student_bp.route('/student/results')
+@login_required('student')
+def student_results():
+    return render_template('student_results.html', results=student_result_rows(session['student_id']))
+
+@student_bp.route('/student/api/panels/results')
+@login_required('student')
+@cache_policy(PANEL_CACHE_CONTROL)
+def student_results_panel():
+    return panel_response(student_result_rows(session['student_id']))
+
+@student_bp.route('/student/logout')
+def student_logout():
+    session.clear()
+    flash('Logged out successfully!', 'info')
+    return redirect('/')
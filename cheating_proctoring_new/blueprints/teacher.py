@@ -0,0 +1,332 @@
+"""Teacher portal: exam authoring, monitoring and results"""
+from datetime import datetime, timedelta
+
+from flask import Blueprint, render_template, jsonify, session, redirect, request, flash
+from sqlalchemy.exc import IntegrityError
+
+from auth import login_required, verify_password, login_busy_response, LoginBusy
+from dashboards import (teacher_counters, teacher_recent_events, teacher_student_page,
+                        panel_response, invalidate_dashboards, PANEL_CACHE_CONTROL)
+from extensions import db
+from http_policy import cache_policy
+from models import User, Exam, Question, ExamAttempt, CheatingLog, CameraLog
+from question_import import import_question_bank, detect_format, QuestionBankError
+from questions import bump_question_version
+from rollups import violation_timeline, CAMERA, CHEATING
+
+teacher_bp = Blueprint('teacher', __name__)
+
+@teacher_bp.route('/teacher/login', methods=['GET', 'POST'])
+def teacher_login():
+    if request.method == 'POST':
+        username = request.form['username']
+        password = request.form['password']
+        user = User.query.filter_by(username=username, role='teacher').first()
+        
+        try:
+            valid = user is not None and verify_password(user.password_hash, password)
+        except LoginBusy:
+            return login_busy_response('teacher_login.html')
+        
+        if valid:
+            session['teacher_logged_in'] = True
+            session['teacher_id'] = user.id
+            session['teacher_name'] = user.full_name
+            flash('Teacher login successful!', 'success')
+            return redirect('/teacher/dashboard')
+        flash('Invalid credentials!', 'danger')
+    return render_template('teacher_login.html')
+
+@teacher_bp.route('/teacher/dashboard')
+@login_required('teacher')
+def teacher_dashboard():
+    # First paint uses the same panels the page then refreshes in place
+    return render_template('teacher_dashboard.html',
+                         counters=teacher_counters(),
+                         students_panel=teacher_student_page(),
+                         events=teacher_recent_events(),
+                         teacher_name=session['teacher_name'])
+
+@teacher_bp.route('/teacher/api/panels/counters')
+@login_required('teacher')
+@cache_policy(PANEL_CACHE_CONTROL)
+def teacher_counters_panel():
+    return panel_response(teacher_counters())
+
+@teacher_bp.route('/teacher/api/panels/events')
+@login_required('teacher')
+@cache_policy(PANEL_CACHE_CONTROL)
+def teacher_events_panel():
+    return panel_response(teacher_recent_events())
+
+@teacher_bp.route('/teacher/api/panels/students')
+@login_required('teacher')
+@cache_policy(PANEL_CACHE_CONTROL)
+def teacher_students_panel():
+    page = max(1, request.args.get('page', 1, type=int))
+    per_page = min(max(1, request.args.get('per_page', 50, type=int)), 200)
+    return panel_response(teacher_student_page(page, per_page))
+
+@teacher_bp.route('/teacher/student_details/<int:student_id>')
+@login_required('teacher')
+def student_details(student_id):
+    student = User.query.get_or_404(student_id)
+    attempts = ExamAttempt.query.filter(
+        ExamAttempt.student_id == student_id, ExamAttempt.start_time.isnot(None)
+    ).all()
+    
+    attempt_details = []
+    for attempt in attempts:
+        exam = Exam.query.get(attempt.exam_id)
+        cheating_logs = CheatingLog.query.filter_by(attempt_id=attempt.id).all()
+        camera_logs = CameraLog.query.filter_by(attempt_id=attempt.id).all()
+        
+        attempt_details.append({
+            'exam_title': exam.title,
+            'start_time': attempt.start_time,
+            'end_time': attempt.end_time,
+            'submitted': attempt.submitted,
+            'marks': attempt.final_marks,
+            'cheating_count': attempt.cheating_count,
+            'terminated': attempt.terminated,
+            'cheating_logs': cheating_logs,
+            'camera_logs': camera_logs
+        })
+    
+    return render_template('student_details.html',
+                         student=student,
+                         attempts=attempt_details)
+
+@teacher_bp.route('/teacher/exam_results')
+@login_required('teacher')
+def exam_results():
+    exams = Exam.query.all()
+    exam_results = []
+    
+    for exam in exams:
+        attempts = ExamAttempt.query.filter_by(exam_id=exam.id, submitted=True).all()
+        
+        if attempts:
+            results = []
+            for attempt in attempts:
+                student = User.query.get(attempt.student_id)
+                camera_warnings = CameraLog.query.filter_by(attempt_id=attempt.id).count()
+                grade = 'A' if attempt.final_marks >= 16 else 'B' if attempt.final_marks >= 12 else 'C' if attempt.final_marks >= 8 else 'F'
+                
+                results.append({
+                    'roll_number': student.username,
+                    'name': student.full_name,
+                    'marks': attempt.final_marks,
+                    'total_marks': exam.total_questions,
+                    'grade': grade,
+                    'cheating_count': attempt.cheating_count,
+                    'camera_warnings': camera_warnings,
+                    'terminated': attempt.terminated
+                })
+            
+            exam_results.append({
+                'exam': exam,
+                'results': sorted(results, key=lambda x: x['marks'], reverse=True),
+                'collusion': _collusion_pairs(exam.id)
+            })
+    
+    return render_template('exam_results.html', exam_results=exam_results)
+
+def _collusion_pairs(exam_id):
+    """Flagged answer-similarity pairs with student names attached"""
+    from collusion import get_collusion_flags
+    flags = get_collusion_flags(exam_id)
+    student_ids = {f['student_a_id'] for f in flags} | {f['student_b_id'] for f in flags}
+    students = {u.id: u for u in User.query.filter(User.id.in_(student_ids))} if student_ids else {}
+    
+    pairs = []
+    for flag in flags:
+        a, b = students.get(flag['student_a_id']), students.get(flag['student_b_id'])
+        pairs.append(dict(flag,
+                          student_a=f'{a.full_name} ({a.username})' if a else flag['student_a_id'],
+                          student_b=f'{b.full_name} ({b.username})' if b else flag['student_b_id']))
+    return pairs
+
+@teacher_bp.route('/teacher/api/exams/<int:exam_id>/collusion')
+@login_required('teacher')
+def collusion_api(exam_id):
+    """Pairs of attempts with suspiciously similar answers"""
+    exam = Exam.query.get_or_404(exam_id)
+    return jsonify({'exam_id': exam.id, 'pairs': _collusion_pairs(exam.id)})
+
+@teacher_bp.route('/teacher/api/exams/<int:exam_id>/violations/timeline')
+@login_required('teacher')
+def violation_timeline_api(exam_id):
+    """Violations per time bucket and event type (?bucket=<minutes>&source=cheating|camera)"""
+    exam = Exam.query.get_or_404(exam_id)
+    bucket_minutes = request.args.get('bucket', 1, type=int)
+    source = request.args.get('source') or None
+    if not 1 <= bucket_minutes <= 1440 or source not in (None, CHEATING, CAMERA):
+        return jsonify({'error': 'bucket must be 1-1440 minutes, source cheating or camera'}), 400
+    return jsonify(violation_timeline(exam, bucket_minutes, source))
+
+@teacher_bp.route('/teacher/exam_results/<int:exam_id>/regrade', methods=['POST'])
+@login_required('teacher')
+def regrade_exam_form(exam_id):
+    """Regrade button on the results page"""
+    from regrade import regrade_exam
+    exam = Exam.query.get_or_404(exam_id)
+    result = regrade_exam(exam.id)
+    flash(f"Regraded {result['attempts']} attempts of {exam.title}: {result['changed']} marks changed.", 'success')
+    return redirect('/teacher/exam_results')
+
+@teacher_bp.route('/teacher/api/exams/<int:exam_id>/regrade', methods=['POST'])
+@login_required('teacher')
+def regrade_exam_api(exam_id):
+    """Regrade every submitted attempt against the current answer key"""
+    from regrade import regrade_exam
+    exam = Exam.query.get_or_404(exam_id)
+    return jsonify(dict(regrade_exam(exam.id), success=True))
+
+@teacher_bp.route('/teacher/create_exam', methods=['GET', 'POST'])
+@login_required('teacher')
+def create_exam():
+    if request.method == 'POST':
+        title = request.form['title']
+        duration = int(request.form['duration'])
+        total_questions = int(request.form['total_questions'])
+        # Optional: scheduled exams open at a fixed time (UTC)
+        starts_at = request.form.get('starts_at')
+        try:
+            starts_at = datetime.fromisoformat(starts_at) if starts_at else None
+        except ValueError:
+            flash('Start time must be a valid date and time.', 'danger')
+            return render_template('create_exam.html')
+        
+        exam = Exam(
+            title=title,
+            duration_minutes=duration,
+            total_questions=total_questions,
+            created_by=session['teacher_id'],
+            is_published=True,
+            starts_at=starts_at
+        )
+        db.session.add(exam)
+        db.session.commit()
+        invalidate_dashboards()
+        
+        flash('Exam created successfully! Now add questions.', 'success')
+        return redirect(f'/teacher/add_questions/{exam.id}')
+    
+    return render_template('create_exam.html')
+
+@teacher_bp.route('/teacher/add_questions/<int:exam_id>', methods=['GET', 'POST'])
+@login_required('teacher')
+def add_questions(exam_id):
+    exam = Exam.query.get_or_404(exam_id)
+    
+    if request.method == 'POST':
+        question_text = request.form['question_text']
+        option_a = request.form['option_a']
+        option_b = request.form['option_b']
+        option_c = request.form['option_c']
+        option_d = request.form['option_d']
+        correct_option = request.form['correct_option']
+        
+        question = Question(
+            exam_id=exam_id,
+            question_text=question_text,
+            option_a=option_a,
+            option_b=option_b,
+            option_c=option_c,
+            option_d=option_d,
+            correct_option=correct_option,
+            marks=1
+        )
+        db.session.add(question)
+        bump_question_version(exam_id)
+        db.session.commit()
+        
+        flash('Question added successfully!', 'success')
+        return redirect(f'/teacher/add_questions/{exam_id}')
+    
+    # Count existing questions
+    existing_questions = Question.query.filter_by(exam_id=exam_id).count()
+    questions_remaining = exam.total_questions - existing_questions
+    
+    return render_template('add_questions.html',
+                         exam=exam,
+                         existing_questions=existing_questions,
+                         questions_remaining=questions_remaining)
+
+@teacher_bp.route('/teacher/add_questions/<int:exam_id>/import', methods=['POST'])
+@login_required('teacher')
+def import_questions_form(exam_id):
+    """Bulk import from the Add Questions page"""
+    exam = Exam.query.get_or_404(exam_id)
+    upload = request.files.get('question_bank')
+    
+    if not upload or not upload.filename:
+        flash('Choose a CSV or JSON file to import.', 'warning')
+        return redirect(f'/teacher/add_questions/{exam_id}')
+    
+    try:
+        result = import_question_bank(exam, upload.stream, detect_format(upload.filename, upload.mimetype))
+    except QuestionBankError as e:
+        details = '; '.join(f'row {row}: {message}' for row, message in e.errors[:5])
+        flash(f'Import failed, nothing was saved. {details}' + (' ...' if len(e.errors) > 5 else ''), 'danger')
+        return redirect(f'/teacher/add_questions/{exam_id}')
+    except IntegrityError:
+        flash('Another import for this exam was running. Please try again.', 'danger')
+        return redirect(f'/teacher/add_questions/{exam_id}')
+    
+    flash(f"Imported {result['inserted']} new and updated {result['updated']} existing questions.", 'success')
+    return redirect(f'/teacher/add_questions/{exam_id}')
+
+@teacher_bp.route('/teacher/api/exams/<int:exam_id>/questions/import', methods=['POST'])
+@login_required('teacher')
+def import_questions_api(exam_id):
+    """Bulk import API: multipart `question_bank` file or a raw CSV/JSON body"""
+    exam = Exam.query.get_or_404(exam_id)
+    upload = request.files.get('question_bank')
+    if upload:
+        stream, fmt = upload.stream, detect_format(upload.filename, upload.mimetype)
+    else:
+        stream, fmt = request.stream, detect_format(None, request.mimetype)
+    fmt = request.args.get('format', fmt)
+    if fmt not in ('csv', 'json', 'jsonl'):
+        return jsonify({'error': 'format must be csv, json or jsonl'}), 400
+    
+    try:
+        result = import_question_bank(exam, stream, fmt)
+    except QuestionBankError as e:
+        return jsonify({
+            'error': 'Invalid question bank, nothing was saved',
+            'errors': [{'row': row, 'message': message} for row, message in e.errors]
+        }), 400
+    except IntegrityError:
+        return jsonify({'error': 'A concurrent import for this exam conflicted, please retry'}), 409
+    
+    return jsonify(dict(result, success=True))
+
+@teacher_bp.route('/teacher/live_updates')
+@login_required('teacher')
+def live_updates():
+    """Provide live updates for cheating events"""
+    # Get counts of recent events (last 10 seconds)
+    ten_seconds_ago = datetime.utcnow() - timedelta(seconds=10)
+    
+    new_cheating_events = CheatingLog.query.filter(
+        CheatingLog.timestamp >= ten_seconds_ago
+    ).count()
+    
+    new_camera_events = CameraLog.query.filter(
+        CameraLog.timestamp >= ten_seconds_ago
+    ).count()
+    
+    return jsonify({
+        'new_cheating_events': new_cheating_events,
+        'new_camera_events': new_camera_events,
+        'timestamp': datetime.utcnow().isoformat()
+    })
+
+@teacher_bp.route('/teacher/logout')
+def teacher_logout():
+    session.clear()
+    flash('Teacher logged out successfully!', 'info')
+    return redirect('/')
@@ -0,0 +1,181 @@
+"""Answer-similarity (collusion) analysis for an exam.
+
+Each submitted attempt becomes a row of option codes (see regrade). Pairwise
+agreement is computed block by block with one-hot matrix products, so memory
+stays at a few block x block arrays however large the cohort is. Matching
+wrong answers weigh more than matching right ones: two strong students agree
+on the right answers by construction, sharing the same mistakes is rarer."""
+from datetime import datetime
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import delete, func, insert, select, update
+
+from cache import cache
+from extensions import db
+from models import CollusionFlag, Exam, ExamAttempt
+from regrade import load_answer_key, load_answer_matrix, UNANSWERED
+
+# Thresholds used by find_similar_pairs; override any subset via the
+# COLLUSION_DETECTION config key
+DEFAULT_COLLUSION = {
+    'wrong_answer_weight': 3.0,
+    'min_score': 0.9,
+    'min_shared_wrong': 4,
+    'block_size': 1024,
+    'max_flags': 500,
+}
+
+def collusion_params(overrides=None):
+    params = dict(DEFAULT_COLLUSION)
+    params.update(overrides or {})
+    return params
+
+def _one_hot(block, options):
+    """(rows, questions * options) float32 indicator of each chosen option"""
+    hot = np.zeros((block.shape[0], block.shape[1], options), dtype=np.float32)
+    rows, cols = np.nonzero(block != UNANSWERED)
+    hot[rows, cols, block[rows, cols]] = 1.0
+    return hot.reshape(block.shape[0], -1)
+
+def find_similar_pairs(matrix, correct_options, params=None):
+    """Return [(i, j, both_answered, matching, shared_wrong, score)] for row
+    pairs i < j of `matrix` that cross the thresholds, highest score first.
+    
+    score = (matching + (w - 1) * shared_wrong) / (both_answered + (w - 1) * shared_wrong)
+    which is 1.0 for identical answer sheets and rises faster with shared mistakes."""
+    params = collusion_params(params)
+    weight, block_size = params['wrong_answer_weight'], params['block_size']
+    min_score, max_flags = params['min_score'], params['max_flags']
+    options = int(max(matrix.max(initial=0), correct_options.max(initial=0))) + 1
+    # Split each one-hot row into the correct-answer columns and the wrong-option
+    # columns: matching = correct . correct + wrong . wrong
+    is_wrong = _one_hot(correct_options[np.newaxis, :], options)[0] == 0
+    
+    def features(block):
+        hot = _one_hot(block, options)
+        return hot[:, ~is_wrong], hot[:, is_wrong], (block != UNANSWERED).astype(np.float32)
+    
+    # score >= min_score  <=>  shared_correct + (1 + (w - 1)(1 - min_score)) shared_wrong
+    # - min_score both_answered >= 0, so the threshold test is one product of
+    # stacked features; the exact counts are only gathered for flagged pairs
+    wrong_scale = 1 + (weight - 1) * (1 - min_score)
+    
+    pairs = []
+    n = matrix.shape[0]
+    for start_a in range(0, n, block_size):
+        correct_a, wrong_a, answered_a = features(matrix[start_a:start_a + block_size])
+        left = np.hstack([correct_a, wrong_scale * wrong_a, -min_score * answered_a])
+        for start_b in range(start_a, n, block_size):
+            correct_b, wrong_b, answered_b = features(matrix[start_b:start_b + block_size])
+            
+            margin = left @ np.hstack([correct_b, wrong_b, answered_b]).T
+            flagged = (margin >= -1e-4) & (wrong_a @ wrong_b.T >= params['min_shared_wrong'])
+            if start_a == start_b:
+                flagged = np.triu(flagged, k=1)
+            rows, cols = np.nonzero(flagged)
+            if not len(rows):
+                continue
+            
+            both_answered = np.einsum('ij,ij->i', answered_a[rows], answered_b[cols])
+            shared_wrong = np.einsum('ij,ij->i', wrong_a[rows], wrong_b[cols])
+            matching = np.einsum('ij,ij->i', correct_a[rows], correct_b[cols]) + shared_wrong
+            score = (matching + (weight - 1) * shared_wrong) / (both_answered + (weight - 1) * shared_wrong)
+            pairs.extend(zip((rows + start_a).tolist(), (cols + start_b).tolist(),
+                             both_answered.astype(int).tolist(), matching.astype(int).tolist(),
+                             shared_wrong.astype(int).tolist(), score.tolist()))
+            # Keep memory bounded when loose thresholds flag many pairs
+            if len(pairs) > 2 * max_flags:
+                pairs.sort(key=lambda pair: pair[5], reverse=True)
+                del pairs[max_flags:]
+    
+    pairs.sort(key=lambda pair: pair[5], reverse=True)
+    return pairs[:max_flags]
+
+def submitted_count(exam_id):
+    return db.session.execute(
+        select(func.count(ExamAttempt.id))
+        .where(ExamAttempt.exam_id == exam_id, ExamAttempt.submitted == True)
+    ).scalar()
+
+def analyze_exam(exam_id, force=False):
+    """Recompute the exam's flagged pairs if submissions arrived since the last
+    run. Returns True if this call wrote the results. Safe to run from several
+    workers: only the one that moves collusion_checked_submissions writes."""
+    if not force and db.session.scalar(
+        select(func.coalesce(Exam.collusion_checked_submissions, 0)).where(Exam.id == exam_id)
+    ) == submitted_count(exam_id):
+        return False
+    
+    question_ids, correct_options, _ = load_answer_key(exam_id)
+    rows = db.session.execute(
+        select(ExamAttempt.id, ExamAttempt.student_id)
+        .where(ExamAttempt.exam_id == exam_id, ExamAttempt.submitted == True)
+        .order_by(ExamAttempt.id)
+    ).all()
+    attempt_ids = np.array([row[0] for row in rows], dtype=np.int64)
+    matrix = load_answer_matrix(exam_id, attempt_ids, question_ids)
+    # The analysis runs outside any transaction; a write lock held through it
+    # would stall autosaves, violations and submissions (on SQLite, all writers)
+    db.session.rollback()
+    pairs = find_similar_pairs(matrix, correct_options, current_app.config['COLLUSION_DETECTION'])
+    
+    # Claim and write the results in one short transaction
+    claim = update(Exam).where(Exam.id == exam_id).values(collusion_checked_submissions=len(rows))
+    if not force:
+        claim = claim.where(func.coalesce(Exam.collusion_checked_submissions, 0) != len(rows))
+    if db.session.execute(claim).rowcount == 0:
+        db.session.rollback()
+        return False
+    
+    db.session.execute(delete(CollusionFlag).where(CollusionFlag.exam_id == exam_id))
+    if pairs:
+        now = datetime.utcnow()
+        db.session.execute(insert(CollusionFlag), [{
+            'exam_id': exam_id,
+            'attempt_a_id': rows[i][0], 'attempt_b_id': rows[j][0],
+            'student_a_id': rows[i][1], 'student_b_id': rows[j][1],
+            'both_answered': both_answered, 'matching_answers': matching,
+            'shared_wrong': shared_wrong, 'score': score, 'created_at': now,
+        } for i, j, both_answered, matching, shared_wrong, score in pairs])
+    db.session.commit()
+    return True
+
+def analyze_submitted_exams():
+    """Scheduled job: analyse every exam with new submissions"""
+    stale = db.session.execute(
+        select(Exam.id)
+        .join(ExamAttempt, ExamAttempt.exam_id == Exam.id)
+        .where(ExamAttempt.submitted == True)
+        .group_by(Exam.id, Exam.collusion_checked_submissions)
+        .having(func.count(ExamAttempt.id) != func.coalesce(Exam.collusion_checked_submissions, 0))
+    ).scalars().all()
+    for exam_id in stale:
+        analyze_exam(exam_id)
+
+def get_collusion_flags(exam_id):
+    """Stored flagged pairs for an exam, as of the last analysis (run by
+    analyze_submitted_exams or detect-collusion, never by readers). Cached per
+    exam and analysed submission count."""
+    checked = db.session.scalar(
+        select(func.coalesce(Exam.collusion_checked_submissions, 0)).where(Exam.id == exam_id)
+    )
+    
+    def load():
+        return [flag_to_dict(flag) for flag in CollusionFlag.query
+                .filter_by(exam_id=exam_id)
+                .order_by(CollusionFlag.score.desc())]
+    
+    return cache.get_or_set(('collusion', exam_id, checked), load)
+
+def flag_to_dict(flag):
+    return {
+        'attempt_a_id': flag.attempt_a_id,
+        'attempt_b_id': flag.attempt_b_id,
+        'student_a_id': flag.student_a_id,
+        'student_b_id': flag.student_b_id,
+        'both_answered': flag.both_answered,
+        'matching_answers': flag.matching_answers,
+        'shared_wrong': flag.shared_wrong,
+        'score': round(flag.score, 3),
+    }
@@ -0,0 +1,117 @@
+"""`flask` CLI commands (run with `flask --app wsgi <command>`)"""
+import json
+
+import click
+
+def _get_exam(exam_id):
+    """The exam with this id, or a usage error (get_or_404 is for requests)"""
+    from extensions import db
+    from models import Exam
+    exam = db.session.get(Exam, exam_id)
+    if exam is None:
+        raise click.BadParameter(f'no exam with id {exam_id}', param_hint='EXAM_ID')
+    return exam
+
+def register_commands(app):
+    @app.cli.command('init-db')
+    @click.option('--reset', is_flag=True, help='Drop all tables first (deletes all data)')
+    def init_db_command(reset):
+        """Create tables and demo accounts (run once before starting workers)"""
+        from seed import init_db, StaleSchema
+        try:
+            init_db(reset=reset)
+        except StaleSchema as e:
+            raise click.ClickException(str(e))
+    
+    @app.cli.command('provision-exam')
+    @click.argument('exam_id', type=int)
+    def provision_exam_command(exam_id):
+        """Pre-create attempts for every student and warm the question caches"""
+        from provisioning import provision_exam
+        created = provision_exam(_get_exam(exam_id))
+        print(f"✅ Provisioned {created} attempts for exam {exam_id}")
+    
+    @app.cli.command('regrade-exam')
+    @click.argument('exam_id', type=int)
+    def regrade_exam_command(exam_id):
+        """Regrade every submitted attempt against the current answer key"""
+        from regrade import regrade_exam
+        _get_exam(exam_id)
+        result = regrade_exam(exam_id)
+        print(f"✅ Regraded {result['attempts']} attempts x {result['questions']} questions, "
+              f"{result['changed']} marks changed (mean {result['mean_before']:.2f} -> {result['mean_after']:.2f})")
+    
+    @app.cli.command('detect-collusion')
+    @click.argument('exam_id', type=int)
+    @click.option('--force', is_flag=True, help='Reanalyse even without new submissions')
+    def detect_collusion_command(exam_id, force):
+        """Flag pairs of attempts with suspiciously similar answers"""
+        from collusion import analyze_exam
+        from models import CollusionFlag
+        _get_exam(exam_id)
+        if not analyze_exam(exam_id, force=force):
+            print("No new submissions since the last analysis (use --force to rerun)")
+        flags = CollusionFlag.query.filter_by(exam_id=exam_id).order_by(CollusionFlag.score.desc()).all()
+        print(f"✅ {len(flags)} flagged pairs for exam {exam_id}")
+        for flag in flags[:20]:
+            print(f"   attempts {flag.attempt_a_id} & {flag.attempt_b_id}: score {flag.score:.2f}, "
+                  f"{flag.matching_answers}/{flag.both_answered} matching, {flag.shared_wrong} shared wrong")
+    
+    @app.cli.command('backfill-violation-rollups')
+    @click.option('--exam-id', type=int, default=None, help='Only rebuild this exam')
+    def backfill_violation_rollups_command(exam_id):
+        """Rebuild per-minute violation rollups from the cheating and camera logs"""
+        from rollups import backfill_rollups
+        written = backfill_rollups(exam_id)
+        print(f"✅ Wrote {written} rollup rows" + (f" for exam {exam_id}" if exam_id else ""))
+    
+    @app.cli.command('expire-attempts')
+    def expire_attempts_command():
+        """Submit and grade open attempts whose time has run out"""
+        from expiry import expire_overdue_attempts
+        print(f"✅ Finalized {expire_overdue_attempts()} overdue attempts")
+    
+    @app.cli.command('replay-camera-logs')
+    @click.option('--candidate', 'candidate_path', type=click.Path(exists=True, dir_okay=False),
+                  help='JSON file with detection settings to try, e.g. {"min_neighbors": 4}')
+    @click.option('--set', 'overrides', multiple=True, metavar='KEY=VALUE',
+                  help='Single detection setting to try (repeatable)')
+    @click.option('--exam-id', type=int, help='Only replay frames from this exam')
+    @click.option('--state', 'state_path', default='replay_state.json', show_default=True,
+                  help='Checkpoint file; rerun with the same file to resume')
+    @click.option('--report', 'report_path', default='replay_report.json', show_default=True)
+    @click.option('--batch-size', default=500, show_default=True)
+    @click.option('--workers', type=int, help='Worker processes (default: CPU count)')
+    def replay_camera_logs_command(candidate_path, overrides, exam_id, state_path, report_path, batch_size, workers):
+        """Re-score stored camera frames with candidate detection settings"""
+        from detection import DEFAULT_DETECTION
+        from replay import replay_camera_logs
+        
+        candidate = {}
+        if candidate_path:
+            with open(candidate_path) as f:
+                candidate.update(json.load(f))
+        for override in overrides:
+            key, _, value = override.partition('=')
+            candidate[key] = json.loads(value)
+        unknown = set(candidate) - set(DEFAULT_DETECTION)
+        if unknown:
+            raise click.BadParameter(f"unknown detection settings: {', '.join(sorted(unknown))}")
+        
+        def progress(state):
+            click.echo(f"  {state['frames']} frames replayed, {state['changed']} verdicts changed (last id {state['last_id']})")
+        
+        try:
+            report = replay_camera_logs(candidate, state_path, batch_size, workers, exam_id, progress)
+        except ValueError as e:
+            raise click.UsageError(str(e))
+        
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        
+        click.echo(f"✅ {report['frames']} frames, {report['changed']} verdicts changed")
+        for transition, count in report['transitions'].items():
+            click.echo(f"   {transition}: {count}")
+        click.echo(f"   attempts affected: {len(report['attempts'])}, "
+                   f"termination outcome changed: {sum(a['terminated_before'] != a['terminated_after'] for a in report['attempts'])}")
+        click.echo(f"📄 Full report: {report_path}")
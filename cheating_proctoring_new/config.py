@@ -0,0 +1,59 @@
+import os
+
+class Config:
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'exam-system-secret-key-12345')
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///exam.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # 'database' keeps violation counters on the ExamAttempt row (safe for any number
+    # of workers); 'local' keeps them in process memory (single worker only)
+    VIOLATION_STORE = os.environ.get('VIOLATION_STORE', 'database')
+    
+    # Password checks run on a bounded pool; logins beyond the queue get a 503
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', os.cpu_count() or 2))
+    PASSWORD_QUEUE_LIMIT = int(os.environ.get('PASSWORD_QUEUE_LIMIT', 64))
+    PASSWORD_CHECK_TIMEOUT = 10
+    LOGIN_RETRY_AFTER_SECONDS = 5
+    
+    # Camera frame admission (see admission.py). WORKER_THREADS must match the
+    # server's threads per worker (gunicorn.conf.py reads the same variable).
+    WORKER_THREADS = int(os.environ.get('WORKER_THREADS', 4))
+    FRAME_MAX_IN_FLIGHT = int(os.environ.get('FRAME_MAX_IN_FLIGHT', 2))
+    FRAME_RESERVED_SLOTS = 1
+    FRAME_MIN_INTERVAL_SECONDS = 2
+    FRAME_RETRY_AFTER_SECONDS = 5
+    
+    # Overrides for detection.DEFAULT_DETECTION (face size/centering thresholds,
+    # cascade parameters); test candidates offline with `flask replay-camera-logs`
+    FACE_DETECTION = {}
+    
+    # Proctoring heartbeats: share of clean heartbeats answered with a request
+    # for a full frame, and how many identical frame hashes in a row look frozen
+    HEARTBEAT_AUDIT_RATE = 0.05
+    HEARTBEAT_MAX_REPEATED_FRAMES = 5
+    # Browsers without an in-page face detector upload a full frame on every
+    # sync tick instead; a positive value limits that to one per this many
+    # seconds (fewer face checks for those students, less upload and CPU)
+    FALLBACK_FRAME_INTERVAL_SECONDS = int(os.environ.get('FALLBACK_FRAME_INTERVAL_SECONDS', 0))
+    
+    # Overrides for collusion.DEFAULT_COLLUSION (answer-similarity thresholds)
+    COLLUSION_DETECTION = {}
+    
+    # Dashboard panels are cached briefly and dropped on writes in this worker;
+    # rendered rows for submitted attempts are kept much longer
+    DASHBOARD_CACHE_SECONDS = 5
+    FRAGMENT_CACHE_SECONDS = 3600
+    
+    # Static files are linked as /static/<file>?v=<content hash> and cached this
+    # long; HTML/JSON responses at least COMPRESS_MIN_SIZE bytes are compressed
+    STATIC_MAX_AGE_SECONDS = 365 * 24 * 3600
+    COMPRESS_MIN_SIZE = 1024
+    COMPRESS_MIMETYPES = ('text/html', 'application/json')
+    COMPRESS_LEVEL = 5
+    
+    # Background jobs (see scheduler.py)
+    SCHEDULER_INTERVAL_SECONDS = 30
+    PROVISION_LEAD_MINUTES = 15
+    # Open attempts this long past start_time + duration are submitted by the
+    # server (expiry.py), graded from their saved answers
+    EXPIRY_GRACE_SECONDS = 120
+    EXPIRY_BATCH_SIZE = 500
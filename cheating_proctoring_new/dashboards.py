@@ -0,0 +1,227 @@
+"""Dashboard panels: counters, recent events and table pages.
+
+Each panel is built as a JSON-able dict and cached for DASHBOARD_CACHE_SECONDS.
+Submissions, regrades and new exams also make the affected panels stale
+straight away with invalidate_dashboards(). Events that arrive many times a
+second during an exam (violations, exam starts) just wait out the short TTL,
+and so do other workers. Table rows for submitted attempts never change, so
+their rendered HTML is cached for much longer, keyed by what the row shows."""
+from collections import Counter
+import threading
+
+from flask import current_app, render_template, request
+from sqlalchemy import case, distinct, func, select
+
+from cache import cache
+from extensions import db
+from models import User, Exam, ExamAttempt, CheatingLog, CameraLog
+
+# Panels may be kept by the browser but must be revalidated (ETag) every time
+PANEL_CACHE_CONTROL = 'private, no-cache'
+
+# Invalidation scopes: admin/teacher panels, and every student's results
+OVERVIEW = 'overview'
+RESULTS = 'results'
+
+# Generation per scope, part of the cache key of every panel in the scope
+_generations = Counter()
+_generations_lock = threading.Lock()
+
+def student_scope(student_id):
+    """Scope of one student's results panel"""
+    return ('student', student_id)
+
+def invalidate_dashboards(*scopes):
+    """Make the cached panels in `scopes` (default: the overview) stale after
+    a write that changes them. Only a counter moves; the old entries are
+    never read again and age out of the cache."""
+    with _generations_lock:
+        for scope in scopes or (OVERVIEW,):
+            _generations[scope] += 1
+
+def _panel(scopes, key, factory):
+    generations = tuple(_generations[scope] for scope in scopes)
+    return cache.get_or_set(('dashboard',) + key + generations, factory,
+                            current_app.config['DASHBOARD_CACHE_SECONDS'])
+
+def _fragment(template, key, immutable, **context):
+    """Render a row template, reusing the cached HTML for immutable rows"""
+    if not immutable:
+        return render_template(template, **context)
+    return cache.get_or_set(('fragment', template) + key,
+                            lambda: render_template(template, **context),
+                            current_app.config['FRAGMENT_CACHE_SECONDS'])
+
+def _rows(fragments, colspan, empty_message):
+    return ''.join(fragments) or render_template('panels/empty_row.html', colspan=colspan, message=empty_message)
+
+def panel_response(payload):
+    """JSON response with an ETag; 304 if the client already has this version"""
+    response = current_app.json.response(payload)
+    response.add_etag()
+    return response.make_conditional(request)
+
+def _status(attempt):
+    if attempt.terminated:
+        return 'terminated'
+    return 'completed' if attempt.submitted else 'in_progress'
+
+def admin_counters():
+    def build():
+        return {
+            'total_students': User.query.filter_by(role='student').count(),
+            'total_teachers': User.query.filter_by(role='teacher').count(),
+            'total_exams': Exam.query.count(),
+            'total_attempts': ExamAttempt.query.filter(ExamAttempt.start_time.isnot(None)).count(),
+        }
+    return _panel((OVERVIEW,), ('admin_counters',), build)
+
+def admin_recent_activity(limit=10):
+    def build():
+        attempts = db.session.query(ExamAttempt, User.username, Exam.title).join(
+            User, ExamAttempt.student_id == User.id
+        ).join(
+            Exam, ExamAttempt.exam_id == Exam.id
+        ).filter(ExamAttempt.start_time.isnot(None)).order_by(ExamAttempt.start_time.desc()).limit(limit).all()
+        
+        cheating = db.session.query(CheatingLog, User.username).join(
+            User, CheatingLog.student_id == User.id
+        ).order_by(CheatingLog.timestamp.desc()).limit(limit).all()
+        
+        return {
+            'attempts_count': len(attempts),
+            'attempts_html': _rows((
+                _fragment('panels/admin_attempt_row.html', (attempt.id,), attempt.submitted,
+                          username=username, title=title,
+                          start_time=attempt.start_time, status=_status(attempt))
+                for attempt, username, title in attempts
+            ), 4, 'No recent exam attempts'),
+            'cheating_count': len(cheating),
+            'cheating_html': _rows((
+                _fragment('panels/admin_cheating_row.html', (log.id,), True, log=log, username=username)
+                for log, username in cheating
+            ), 3, 'No security alerts'),
+        }
+    return _panel((OVERVIEW,), ('admin_recent_activity', limit), build)
+
+def teacher_counters():
+    def build():
+        started = ExamAttempt.start_time.isnot(None)
+        return {
+            'total_students': User.query.filter_by(role='student').count(),
+            'active_students': db.session.execute(
+                select(func.count(distinct(ExamAttempt.student_id))).where(started, ExamAttempt.submitted == True)
+            ).scalar(),
+            'cheating_events': CheatingLog.query.count(),
+            'terminated_exams': ExamAttempt.query.filter(started, ExamAttempt.terminated == True).count(),
+            'active_sessions': ExamAttempt.query.filter(started, ExamAttempt.submitted == False).count(),
+            'total_warnings': CameraLog.query.count(),
+            'clean_sessions': ExamAttempt.query.filter_by(cheating_count=0, submitted=True).count(),
+            'terminated_by_camera': ExamAttempt.query.filter_by(terminated=True).count(),
+        }
+    return _panel((OVERVIEW,), ('teacher_counters',), build)
+
+def teacher_recent_events(limit=10):
+    def build():
+        cheating = db.session.query(CheatingLog, User, ExamAttempt).join(
+            User, CheatingLog.student_id == User.id
+        ).join(
+            ExamAttempt, CheatingLog.attempt_id == ExamAttempt.id
+        ).order_by(CheatingLog.timestamp.desc()).limit(limit).all()
+        
+        camera = db.session.query(CameraLog, User, ExamAttempt).join(
+            User, CameraLog.student_id == User.id
+        ).join(
+            ExamAttempt, CameraLog.attempt_id == ExamAttempt.id
+        ).order_by(CameraLog.timestamp.desc()).limit(limit).all()
+        
+        return {
+            'cheating_count': len(cheating),
+            'cheating_html': _rows((
+                _fragment('panels/teacher_cheating_row.html', (row.CheatingLog.id,), row.ExamAttempt.submitted, cheat=row)
+                for row in cheating
+            ), 5, 'No recent security alerts. Good job!'),
+            'camera_count': len(camera),
+            'camera_html': _rows((
+                _fragment('panels/teacher_camera_row.html', (row.CameraLog.id,), row.ExamAttempt.submitted, log=row)
+                for row in camera
+            ), 6, 'No camera proctoring events yet'),
+        }
+    return _panel((OVERVIEW,), ('teacher_recent_events', limit), build)
+
+def teacher_student_page(page=1, per_page=50):
+    """One page of the student table, with per-student counts from grouped queries"""
+    def build():
+        total = User.query.filter_by(role='student').count()
+        pages = max(1, -(-total // per_page))
+        students = User.query.filter_by(role='student').order_by(User.username).offset(
+            (min(page, pages) - 1) * per_page
+        ).limit(per_page).all()
+        ids = [student.id for student in students]
+        
+        attempts = {row[0]: row[1:] for row in db.session.execute(
+            select(ExamAttempt.student_id, func.count(ExamAttempt.id),
+                   func.sum(case((ExamAttempt.submitted == True, 1), else_=0)),
+                   func.sum(case((ExamAttempt.terminated == True, 1), else_=0)))
+            .where(ExamAttempt.student_id.in_(ids), ExamAttempt.start_time.isnot(None))
+            .group_by(ExamAttempt.student_id)
+        )}
+        cheating = dict(db.session.execute(
+            select(CheatingLog.student_id, func.count(CheatingLog.id))
+            .where(CheatingLog.student_id.in_(ids)).group_by(CheatingLog.student_id)
+        ).all())
+        camera = dict(db.session.execute(
+            select(CameraLog.student_id, func.count(CameraLog.id))
+            .where(CameraLog.student_id.in_(ids)).group_by(CameraLog.student_id)
+        ).all())
+        
+        student_stats = []
+        for student in students:
+            total_attempts, submitted_attempts, terminated_exams = attempts.get(student.id, (0, 0, 0))
+            student_stats.append({
+                'id': student.id,
+                'roll_number': student.username,
+                'name': student.full_name,
+                'total_attempts': total_attempts,
+                'submitted_attempts': submitted_attempts or 0,
+                'cheating_events': cheating.get(student.id, 0),
+                'camera_warnings': camera.get(student.id, 0),
+                'terminated_exams': terminated_exams or 0
+            })
+        
+        return {
+            'page': min(page, pages),
+            'pages': pages,
+            'total': total,
+            'html': render_template('panels/teacher_student_rows.html', student_stats=student_stats),
+        }
+    return _panel((OVERVIEW,), ('teacher_students', page, per_page), build)
+
+def student_result_rows(student_id):
+    def build():
+        rows = db.session.query(ExamAttempt, Exam).join(
+            Exam, ExamAttempt.exam_id == Exam.id
+        ).filter(ExamAttempt.student_id == student_id, ExamAttempt.submitted == True).all()
+        camera = dict(db.session.execute(
+            select(CameraLog.attempt_id, func.count(CameraLog.id))
+            .where(CameraLog.attempt_id.in_([attempt.id for attempt, _ in rows]))
+            .group_by(CameraLog.attempt_id)
+        ).all())
+        
+        html = []
+        for attempt, exam in rows:
+            result = {
+                'exam_title': exam.title,
+                'marks': attempt.final_marks,
+                'total_questions': exam.total_questions,
+                'cheating_count': attempt.cheating_count,
+                'camera_warnings': camera.get(attempt.id, 0),
+                'terminated': attempt.terminated,
+                'completion_time': attempt.end_time.strftime('%Y-%m-%d %H:%M') if attempt.end_time else 'N/A'
+            }
+            # Keyed by every value shown: a regrade moves the marks and a
+            # question import can change the exam's question count
+            html.append(_fragment('panels/student_result_row.html', (attempt.id,) + tuple(result.values()),
+                                  True, result=result))
+        return {'count': len(rows), 'html': ''.join(html)}
+    return _panel((RESULTS, student_scope(student_id)), ('student_results', student_id), build)
@@ -0,0 +1,156 @@
+"""Face detection and the proctoring rules applied to its output.
+
+Kept free of Flask so the offline replay tool can run it in worker processes.
+OpenCV and NumPy are imported on first use so the web app starts without them."""
+import base64
+import queue
+from contextlib import contextmanager
+
+# Thresholds used by analyze_camera_frame; override any subset via the
+# FACE_DETECTION config key or a replay candidate config
+DEFAULT_DETECTION = {
+    'scale_factor': 1.1,
+    'min_neighbors': 5,
+    'min_face_size': 30,
+    'min_face_ratio': 0.15,
+    'center_threshold': 0.3,
+}
+
+# Haar cascades shared by every thread of the process. A cascade must not run
+# on two threads at once, so each call borrows one and hands it back.
+_face_cascades = queue.SimpleQueue()
+
+def _load_face_cascade():
+    import cv2
+    return cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+
+@contextmanager
+def face_detector():
+    """Borrow an idle Haar cascade from the process pool, loading another one
+    only if every cascade is busy"""
+    try:
+        face_cascade = _face_cascades.get_nowait()
+    except queue.Empty:
+        face_cascade = _load_face_cascade()
+    try:
+        yield face_cascade
+    finally:
+        _face_cascades.put(face_cascade)
+
+def preload_detectors(count=1):
+    """Import OpenCV and NumPy and put `count` cascades in the process pool, so
+    that many frames can be analysed at once, on any thread, without loading one"""
+    import numpy  # noqa: F401
+    for _ in range(count):
+        _face_cascades.put(_load_face_cascade())
+
+def detection_params(overrides=None):
+    params = dict(DEFAULT_DETECTION)
+    params.update(overrides or {})
+    return params
+
+def decode_frame(image_data):
+    """Decode a base64 (optionally data-URL) JPEG into a BGR image, or None"""
+    import cv2
+    import numpy as np
+    
+    # Remove header from base64 string
+    if ',' in image_data:
+        image_data = image_data.split(',')[1]
+    
+    image_bytes = base64.b64decode(image_data)
+    nparr = np.frombuffer(image_bytes, np.uint8)
+    return cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+
+def analyze_camera_frame(image, params=None):
+    """Analyze camera frame for proctoring violations"""
+    params = detection_params(params)
+    try:
+        import cv2
+        
+        # Convert to grayscale for face detection
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        
+        # Detect faces with a cascade from the process pool
+        with face_detector() as face_cascade:
+            faces = face_cascade.detectMultiScale(
+                gray,
+                scaleFactor=params['scale_factor'],
+                minNeighbors=params['min_neighbors'],
+                minSize=(params['min_face_size'], params['min_face_size'])
+            )
+        
+        height, width = image.shape[:2]
+        return evaluate_faces(faces, width, height, params)
+    except Exception as e:
+        print(f"Error in face detection: {e}")
+        return {
+            'violation_detected': False,
+            'violation_type': None,
+            'confidence': 0.0,
+            'message': 'Face detection error',
+            'face_count': 0
+        }
+
+def evaluate_faces(faces, width, height, params=None):
+    """Apply the proctoring rules to detected face boxes (x, y, w, h)"""
+    params = detection_params(params)
+    result = {
+        'violation_detected': False,
+        'violation_type': None,
+        'confidence': 0.0,
+        'message': '',
+        'face_count': len(faces)
+    }
+    
+    # Check for no face detected
+    if len(faces) == 0:
+        result.update({
+            'violation_detected': True,
+            'violation_type': 'no_face_detected',
+            'confidence': 0.9,
+            'message': 'No face detected in frame'
+        })
+        return result
+    
+    # Check for multiple faces
+    if len(faces) > 1:
+        result.update({
+            'violation_detected': True,
+            'violation_type': 'multiple_faces_detected',
+            'confidence': min(1.0, len(faces) * 0.3),
+            'message': f'Multiple faces detected: {len(faces)}'
+        })
+        return result
+    
+    # Check face position and size (basic attention monitoring)
+    x, y, w, h = faces[0]
+    
+    # Calculate face position metrics
+    face_center_x = x + w/2
+    face_center_y = y + h/2
+    
+    # Check if face is too small (might be looking away)
+    min_face_ratio = params['min_face_ratio']
+    if w < width * min_face_ratio or h < height * min_face_ratio:
+        result.update({
+            'violation_detected': True,
+            'violation_type': 'face_too_small',
+            'confidence': 0.7,
+            'message': 'Face appears too small - possible attention issue'
+        })
+        return result
+    
+    # Check if face is centered properly
+    center_threshold = params['center_threshold']
+    if (abs(face_center_x - width/2) > width * center_threshold or 
+        abs(face_center_y - height/2) > height * center_threshold):
+        result.update({
+            'violation_detected': True,
+            'violation_type': 'face_not_centered',
+            'confidence': 0.6,
+            'message': 'Face not properly centered in frame'
+        })
+        return result
+    
+    return result
@@ -0,0 +1,60 @@
+"""Server-side exam deadline.
+
+The exam page submits when its timer runs out, but a closed tab never does.
+expire_overdue_attempts() finalizes started, unsubmitted attempts whose
+start_time + duration_minutes + EXPIRY_GRACE_SECONDS has passed. It grades
+them from the answers already saved, with the usual violation penalty, one
+batch at a time. Each batch is claimed with a conditional UPDATE, so workers
+sweeping at the same moment never finalize an attempt twice."""
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, false, or_, select
+
+from answers import finalize_attempts
+from dashboards import invalidate_dashboards, OVERVIEW, RESULTS
+from extensions import db
+from models import Exam, ExamAttempt
+from violations import get_violation_store
+
+def overdue_attempts(now, grace):
+    """Query for the ids of open attempts past their deadline"""
+    durations = db.session.scalars(
+        select(Exam.duration_minutes).where(Exam.duration_minutes.isnot(None)).distinct()
+    ).all()
+    # One cutoff per exam length keeps the date arithmetic out of SQL
+    past_deadline = or_(false(), *(
+        and_(Exam.duration_minutes == minutes,
+             ExamAttempt.start_time <= now - timedelta(minutes=minutes) - grace)
+        for minutes in durations
+    ))
+    return select(ExamAttempt.id).join(Exam, Exam.id == ExamAttempt.exam_id).where(
+        ExamAttempt.submitted == False,
+        ExamAttempt.start_time.isnot(None),
+        past_deadline
+    ).order_by(ExamAttempt.id)
+
+def expire_overdue_attempts(now=None):
+    """Scheduler job. Returns the number of attempts this call finalized."""
+    config = current_app.config
+    now = now or datetime.utcnow()
+    batch_size = config['EXPIRY_BATCH_SIZE']
+    query = overdue_attempts(now, timedelta(seconds=config['EXPIRY_GRACE_SECONDS']))
+    
+    finalized = 0
+    while True:
+        attempt_ids = db.session.scalars(query.limit(batch_size)).all()
+        if not attempt_ids:
+            break
+        # Another worker may claim part of the batch first; we skip those
+        claimed = finalize_attempts(attempt_ids, end_time=now)
+        db.session.commit()
+        for attempt_id in claimed:
+            get_violation_store().discard(attempt_id)
+        finalized += len(claimed)
+        if len(attempt_ids) < batch_size:
+            break
+    
+    if finalized:
+        invalidate_dashboards(OVERVIEW, RESULTS)
+    return finalized
@@ -0,0 +1,4 @@
+from flask_sqlalchemy import SQLAlchemy
+
+# Bound to the application inside create_app()
+db = SQLAlchemy()
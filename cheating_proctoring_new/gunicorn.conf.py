@@ -0,0 +1,23 @@
+"""Gunicorn settings for multi-worker deployments (see wsgi.py)"""
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+# Threaded workers, so a worker analysing camera frames still has threads
+# free for submissions and logins (see admission.py)
+threads = int(os.environ.get('WORKER_THREADS', 4))
+timeout = 30
+
+def post_fork(server, worker):
+    # Load OpenCV and one face detector per concurrently analysed frame in
+    # each worker before it takes traffic; request threads borrow them from
+    # the worker's pool, so the first camera frames don't pay for loading
+    from config import Config
+    from detection import preload_detectors
+    preload_detectors(Config.FRAME_MAX_IN_FLIGHT)
+
+def post_worker_init(worker):
+    # Each worker runs its own copy of the (idempotent) background jobs
+    from scheduler import start_scheduler
+    start_scheduler(worker.wsgi)
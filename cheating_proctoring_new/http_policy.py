@@ -0,0 +1,112 @@
+"""Response policy by route class: caching headers and compression.
+
+Dynamic responses are no-store unless the view opts into something else with
+@cache_policy, since exam pages, dashboards and APIs carry per-user state.
+Static files are linked with a content hash (`?v=`) and served as immutable
+under that URL. HTML and JSON bodies above COMPRESS_MIN_SIZE are compressed
+with brotli (if installed) or gzip."""
+import gzip
+import hashlib
+import os
+
+from flask import current_app, request
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is used without it
+    brotli = None
+
+NO_STORE = 'no-store, no-cache, must-revalidate, max-age=0'
+
+# (path, mtime) -> short content hash; a changed file gets a new URL
+_static_hashes = {}
+
+def cache_policy(cache_control):
+    """Send `cache_control` instead of no-store for this view"""
+    def decorator(f):
+        f.cache_control = cache_control
+        return f
+    return decorator
+
+def static_hash(filename):
+    """Short content hash of a static file, or None if it does not exist"""
+    path = safe_join(current_app.static_folder, filename)
+    if path is None:
+        return None
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    digest = _static_hashes.get((path, mtime))
+    if digest is None:
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:12]
+        _static_hashes[(path, mtime)] = digest
+    return digest
+
+def add_static_hash(endpoint, values):
+    """url_for('static', filename=...) gains ?v=<content hash>"""
+    if endpoint == 'static' and 'v' not in values:
+        digest = static_hash(values.get('filename', ''))
+        if digest:
+            values['v'] = digest
+
+def apply_response_policy(response):
+    if request.endpoint == 'static':
+        version = request.args.get('v')
+        if version and response.status_code in (200, 304) and version == static_hash(request.view_args['filename']):
+            response.headers['Cache-Control'] = f"public, max-age={current_app.config['STATIC_MAX_AGE_SECONDS']}, immutable"
+        else:
+            # Unversioned or outdated URL: keep it, but revalidate every time
+            response.headers['Cache-Control'] = 'no-cache'
+        return response
+    
+    view = current_app.view_functions.get(request.endpoint)
+    cache_control = getattr(view, 'cache_control', None)
+    if cache_control is None:
+        response.headers['Cache-Control'] = NO_STORE
+        response.headers['Pragma'] = 'no-cache'
+        response.headers['Expires'] = '-1'
+    else:
+        response.headers['Cache-Control'] = cache_control
+    return compress_response(response)
+
+def _pick_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+def compress_response(response):
+    """Compress an HTML/JSON body in place if it is large enough"""
+    config = current_app.config
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code != 200
+            or response.mimetype not in config['COMPRESS_MIMETYPES']
+            or 'Content-Encoding' in response.headers):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    encoding = _pick_encoding()
+    if len(data) < config['COMPRESS_MIN_SIZE'] or encoding is None:
+        return response
+    
+    if encoding == 'br':
+        body = brotli.compress(data, quality=config['COMPRESS_LEVEL'])
+    else:
+        body = gzip.compress(data, compresslevel=config['COMPRESS_LEVEL'], mtime=0)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    # Same content, different bytes: the validator becomes weak
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+def init_response_policy(app):
+    app.url_defaults(add_static_hash)
+    app.after_request(apply_response_policy)
@@ -0,0 +1,119 @@
+from datetime import datetime
+
+from extensions import db
+
+class User(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(120), unique=True, nullable=False)
+    password_hash = db.Column(db.String(256), nullable=False)
+    role = db.Column(db.String(20), nullable=False)
+    full_name = db.Column(db.String(200), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Exam(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(255), nullable=False)
+    duration_minutes = db.Column(db.Integer, default=2)
+    total_questions = db.Column(db.Integer, default=20)
+    created_by = db.Column(db.Integer)
+    is_published = db.Column(db.Boolean, default=True)
+    # Scheduled exams open at starts_at; attempts are pre-created before then
+    starts_at = db.Column(db.DateTime, nullable=True)
+    provisioned_at = db.Column(db.DateTime, nullable=True)
+    # Bumped whenever questions change so cached payloads are never stale
+    question_version = db.Column(db.Integer, default=0)
+    # Submitted attempts covered by the last answer-similarity analysis
+    collusion_checked_submissions = db.Column(db.Integer, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class Question(db.Model):
+    __table_args__ = (db.UniqueConstraint('exam_id', 'external_id'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    exam_id = db.Column(db.Integer)
+    # Optional id from an imported question bank, used to upsert on re-import
+    external_id = db.Column(db.String(100), nullable=True)
+    question_text = db.Column(db.Text)
+    option_a = db.Column(db.String(255))
+    option_b = db.Column(db.String(255))
+    option_c = db.Column(db.String(255))
+    option_d = db.Column(db.String(255))
+    correct_option = db.Column(db.String(1))
+    marks = db.Column(db.Integer, default=1)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class ExamAttempt(db.Model):
+    __table_args__ = (db.UniqueConstraint('exam_id', 'student_id'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    exam_id = db.Column(db.Integer)
+    student_id = db.Column(db.Integer)
+    # None until the student opens the exam (pre-provisioned attempts)
+    start_time = db.Column(db.DateTime)
+    end_time = db.Column(db.DateTime)
+    submitted = db.Column(db.Boolean, default=False)
+    cheating_count = db.Column(db.Integer, default=0)
+    tab_switch_count = db.Column(db.Integer, default=0)
+    camera_warning_count = db.Column(db.Integer, default=0)
+    terminated = db.Column(db.Boolean, default=False)
+    final_marks = db.Column(db.Float, default=0)
+    # Presence from proctoring heartbeats
+    last_seen_at = db.Column(db.DateTime, nullable=True)
+    last_frame_hash = db.Column(db.String(64), nullable=True)
+    repeated_frame_count = db.Column(db.Integer, default=0)
+    # Last camera frame admitted for analysis (per-attempt frame rate limit)
+    last_frame_at = db.Column(db.DateTime, nullable=True)
+
+class Answer(db.Model):
+    __table_args__ = (db.UniqueConstraint('attempt_id', 'question_id'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    attempt_id = db.Column(db.Integer)
+    question_id = db.Column(db.Integer)
+    selected_option = db.Column(db.String(1))
+    is_correct = db.Column(db.Boolean, default=False)
+
+class CheatingLog(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer)
+    exam_id = db.Column(db.Integer)
+    attempt_id = db.Column(db.Integer)
+    cheat_type = db.Column(db.String(50))
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+
+class CameraLog(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer)
+    exam_id = db.Column(db.Integer)
+    attempt_id = db.Column(db.Integer)
+    event_type = db.Column(db.String(50))
+    confidence = db.Column(db.Float)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    image_data = db.Column(db.Text)
+
+class ViolationRollup(db.Model):
+    """Violation count per exam, minute and event type (see rollups.py)"""
+    __table_args__ = (db.UniqueConstraint('exam_id', 'bucket', 'source', 'event_type'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    exam_id = db.Column(db.Integer)
+    bucket = db.Column(db.DateTime)  # start of the minute (UTC)
+    source = db.Column(db.String(20))  # 'cheating' (CheatingLog) or 'camera' (CameraLog)
+    event_type = db.Column(db.String(50))
+    event_count = db.Column(db.Integer, default=0)
+
+class CollusionFlag(db.Model):
+    """A pair of attempts with suspiciously similar answers"""
+    __table_args__ = (db.UniqueConstraint('exam_id', 'attempt_a_id', 'attempt_b_id'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    exam_id = db.Column(db.Integer, index=True)
+    attempt_a_id = db.Column(db.Integer)
+    attempt_b_id = db.Column(db.Integer)
+    student_a_id = db.Column(db.Integer)
+    student_b_id = db.Column(db.Integer)
+    both_answered = db.Column(db.Integer)
+    matching_answers = db.Column(db.Integer)
+    shared_wrong = db.Column(db.Integer)
+    score = db.Column(db.Float)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,57 @@
+"""Scheduled exams: pre-create attempts and warm caches before the window opens,
+so the start-of-exam burst only has to update rows that already exist."""
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import insert, select, literal, exists
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models import User, Exam, ExamAttempt
+from questions import warm_exam_caches
+
+def provision_exam(exam):
+    """Create an unstarted ExamAttempt for every student on the roster that
+    doesn't have one yet. Safe to run repeatedly and from several workers."""
+    already_has_attempt = exists().where(
+        ExamAttempt.exam_id == exam.id,
+        ExamAttempt.student_id == User.id
+    )
+    roster = select(literal(exam.id), User.id).where(
+        User.role == 'student', ~already_has_attempt
+    )
+    try:
+        result = db.session.execute(
+            insert(ExamAttempt).from_select(['exam_id', 'student_id'], roster)
+        )
+        exam.provisioned_at = datetime.utcnow()
+        db.session.commit()
+        created = result.rowcount
+    except IntegrityError:
+        # Another worker provisioned the same exam concurrently
+        db.session.rollback()
+        created = 0
+    
+    warm_exam_caches(exam)
+    return created
+
+def provision_upcoming_exams():
+    """Scheduler job for exams opening within PROVISION_LEAD_MINUTES.
+
+    Until the window opens the roster is re-synced on every run (the insert is
+    a no-op once everyone has a row); every worker warms its own caches until
+    the exam is over."""
+    now = datetime.utcnow()
+    lead = timedelta(minutes=current_app.config['PROVISION_LEAD_MINUTES'])
+    candidates = Exam.query.filter(
+        Exam.is_published == True,
+        Exam.starts_at.isnot(None),
+        Exam.starts_at <= now + lead,
+        Exam.starts_at >= now - timedelta(days=1)
+    ).all()
+    
+    for exam in candidates:
+        if now < exam.starts_at:
+            provision_exam(exam)
+        elif now < exam.starts_at + timedelta(minutes=exam.duration_minutes):
+            warm_exam_caches(exam)
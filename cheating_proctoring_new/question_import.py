@@ -0,0 +1,246 @@
+"""Bulk question-bank import from CSV, JSON or JSON Lines.
+
+Rows are validated in a single streaming pass (JSON banks are decoded one
+question at a time, never as a whole document); if any row is invalid nothing
+is written. Valid banks are written in one transaction: rows whose
+external_id already exists for the exam are updated in place, the rest are
+inserted, so re-running the same import is cheap and idempotent."""
+import csv
+import io
+import itertools
+import json
+
+from sqlalchemy import case, func, insert, select, update
+
+from extensions import db
+from models import Exam, Question
+from questions import bump_question_version
+
+FIELDS = ('question_text', 'option_a', 'option_b', 'option_c', 'option_d')
+# Column limits of the text fields (None for unbounded Text columns)
+MAX_LENGTHS = {field: Question.__table__.c[field].type.length for field in FIELDS}
+MAX_ERRORS = 50
+JSON_SHAPE_ERROR = 'expected a list of questions or {"questions": [...]}'
+
+class QuestionBankError(Exception):
+    """The bank failed validation; `errors` lists (row number, message)"""
+    def __init__(self, errors):
+        super().__init__(f'{len(errors)} invalid rows')
+        self.errors = errors
+
+def detect_format(filename, content_type):
+    name = (filename or '').lower()
+    content_type = (content_type or '').lower()
+    if name.endswith('.jsonl') or 'ndjson' in content_type or 'jsonl' in content_type:
+        return 'jsonl'
+    if name.endswith('.json') or 'json' in content_type:
+        return 'json'
+    return 'csv'
+
+class JsonStream:
+    """Decodes JSON values one at a time from a text stream, holding only
+    about one chunk (plus the value being decoded) in memory"""
+    def __init__(self, text, chunk_size=65536):
+        self.text = text
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """Read another chunk; False at the end of the stream"""
+        if self.eof:
+            return False
+        chunk = self.text.read(self.chunk_size)
+        # Drop what has been consumed
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        self.eof = not chunk
+        return not self.eof
+
+    def peek(self):
+        """The next non-whitespace character, or '' at the end"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, chars):
+        """Consume the next character, which must be one of `chars`"""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"expected {' or '.join(chars)} but found {char or 'the end of the file'}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if self._fill():
+                    continue
+                # Positions would be relative to the buffer, not the file
+                raise ValueError(f'invalid JSON ({e.msg})') from None
+            # A number at the end of the buffer may go on in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+def _json_array(reader):
+    """Yield (row number, item) from the array at the reader's position"""
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.expect(']')
+        return
+    for number in itertools.count(1):
+        yield number, reader.value()
+        if reader.expect(',]') == ']':
+            return
+
+def _json_rows(reader):
+    """Yield (row number, item) from a list of questions or {"questions": [...]}"""
+    first = reader.peek()
+    if first == '[':
+        yield from _json_array(reader)
+    elif first == '{':
+        reader.expect('{')
+        if reader.peek() == '}':
+            reader.expect('}')
+        else:
+            while True:
+                key = reader.value()
+                reader.expect(':')
+                if key != 'questions':
+                    reader.value()
+                elif reader.peek() == '[':
+                    yield from _json_array(reader)
+                else:
+                    raise QuestionBankError([(0, JSON_SHAPE_ERROR)])
+                if reader.expect(',}') == '}':
+                    break
+    else:
+        raise QuestionBankError([(0, JSON_SHAPE_ERROR)])
+    if reader.peek():
+        raise ValueError('unexpected data after the question bank')
+
+def read_rows(stream, fmt):
+    """Yield (row number, dict) from a binary stream"""
+    if fmt == 'json':
+        yield from _json_rows(JsonStream(io.TextIOWrapper(stream, encoding='utf-8-sig')))
+    elif fmt == 'jsonl':
+        for number, line in enumerate(io.TextIOWrapper(stream, encoding='utf-8-sig'), start=1):
+            if line.strip():
+                yield number, json.loads(line)
+    else:
+        # Row 1 is the header
+        reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''))
+        for number, row in enumerate(reader, start=2):
+            yield number, row
+
+def validate_rows(rows):
+    """Return the cleaned rows, or raise QuestionBankError listing the problems"""
+    cleaned = []
+    errors = []
+    seen_external_ids = set()
+    
+    try:
+        for number, row in rows:
+            if not isinstance(row, dict):
+                errors.append((number, 'expected an object'))
+                continue
+            question = {field: str(row.get(field) or '').strip() for field in FIELDS}
+            missing = [field for field in FIELDS if not question[field]]
+            if missing:
+                errors.append((number, f"missing {', '.join(missing)}"))
+            for field, limit in MAX_LENGTHS.items():
+                if limit and len(question[field]) > limit:
+                    errors.append((number, f'{field} is longer than {limit} characters'))
+            
+            correct_option = str(row.get('correct_option') or '').strip().upper()
+            if correct_option not in ('A', 'B', 'C', 'D'):
+                errors.append((number, 'correct_option must be A, B, C or D'))
+            question['correct_option'] = correct_option
+            
+            try:
+                marks = row.get('marks')
+                if marks in (None, ''):
+                    marks = 1
+                elif isinstance(marks, bool):
+                    raise ValueError
+                # float() so that 1.5 is rejected rather than truncated to 1
+                marks = float(marks)
+                if not marks.is_integer() or marks < 1:
+                    raise ValueError
+                question['marks'] = int(marks)
+            except (TypeError, ValueError):
+                errors.append((number, 'marks must be a positive whole number'))
+            
+            external_id = str(row.get('external_id') or '').strip() or None
+            if external_id and len(external_id) > 100:
+                errors.append((number, 'external_id is longer than 100 characters'))
+            elif external_id in seen_external_ids:
+                errors.append((number, f'duplicate external_id {external_id}'))
+            elif external_id:
+                seen_external_ids.add(external_id)
+            question['external_id'] = external_id
+            
+            cleaned.append(question)
+            if len(errors) >= MAX_ERRORS:
+                break
+    except (ValueError, csv.Error, UnicodeDecodeError) as e:
+        errors.append((len(cleaned) + 1, f'unreadable file: {e}'))
+    
+    if errors:
+        raise QuestionBankError(errors)
+    if not cleaned:
+        raise QuestionBankError([(0, 'no questions found')])
+    return cleaned
+
+def import_questions(exam, questions):
+    """Upsert validated questions for an exam in a single transaction"""
+    external_ids = [q['external_id'] for q in questions if q['external_id']]
+    existing = {}
+    for i in range(0, len(external_ids), 500):
+        existing.update(db.session.execute(
+            select(Question.external_id, Question.id).where(
+                Question.exam_id == exam.id,
+                Question.external_id.in_(external_ids[i:i + 500])
+            )
+        ).all())
+    
+    updates = [dict(q, id=existing[q['external_id']]) for q in questions if q['external_id'] in existing]
+    inserts = [dict(q, exam_id=exam.id) for q in questions if q['external_id'] not in existing]
+    
+    try:
+        if updates:
+            db.session.execute(update(Question), updates)
+        if inserts:
+            db.session.execute(insert(Question), inserts)
+        
+        # Keep the exam's question count and cached payloads in step
+        count = db.session.scalar(select(func.count(Question.id)).where(Question.exam_id == exam.id))
+        db.session.execute(
+            update(Exam)
+            .where(Exam.id == exam.id)
+            .values(total_questions=case(
+                (Exam.total_questions < count, count),
+                else_=Exam.total_questions
+            ))
+        )
+        bump_question_version(exam.id)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    
+    return {'inserted': len(inserts), 'updated': len(updates), 'question_count': count}
+
+def import_question_bank(exam, stream, fmt):
+    """Validate and import a bank; returns the import summary"""
+    return import_questions(exam, validate_rows(read_rows(stream, fmt)))
@@ -0,0 +1,52 @@
+"""Cached question payloads and answer keys.
+
+Entries are keyed by Exam.question_version, so any worker sees a change as
+soon as the version is bumped, without cross-process invalidation."""
+from sqlalchemy import update
+
+from cache import cache
+from extensions import db
+from models import Exam, Question
+
+def get_question_payload(exam):
+    """Questions as served to the exam page"""
+    return cache.get_or_set(
+        ('questions', exam.id, exam.question_version),
+        lambda: [question_to_dict(q) for q in _load_questions(exam.id)]
+    )
+
+def get_answer_key(exam):
+    """{question_id: (correct_option, marks)} for grading"""
+    return cache.get_or_set(
+        ('answer_key', exam.id, exam.question_version),
+        lambda: {q.id: (q.correct_option, q.marks) for q in _load_questions(exam.id)}
+    )
+
+def warm_exam_caches(exam):
+    get_question_payload(exam)
+    get_answer_key(exam)
+
+def bump_question_version(exam_id):
+    """Invalidate cached payloads for an exam. Commit with the question change."""
+    db.session.execute(
+        update(Exam)
+        .where(Exam.id == exam_id)
+        .values(question_version=Exam.question_version + 1)
+    )
+
+def question_to_dict(q):
+    return {
+        'id': q.id,
+        'text': q.question_text,
+        'options': {
+            'A': q.option_a,
+            'B': q.option_b,
+            'C': q.option_c,
+            'D': q.option_d
+        },
+        'correct': q.correct_option,
+        'marks': q.marks
+    }
+
+def _load_questions(exam_id):
+    return Question.query.filter_by(exam_id=exam_id).order_by(Question.id).all()
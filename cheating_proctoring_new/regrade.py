@@ -0,0 +1,137 @@
+"""Vectorized regrading of a whole exam.
+
+Answers for every submitted attempt are loaded as an attempts x questions
+matrix of option codes, compared with the answer-key vector in one NumPy
+operation, weighted by per-question marks and run through the violation
+penalty tiers. Only attempts whose marks change are written back."""
+from itertools import chain
+
+import numpy as np
+from sqlalchemy import case, func, select, update
+
+from answers import OPTIONS
+from dashboards import invalidate_dashboards, OVERVIEW, RESULTS
+from extensions import db
+from models import Answer, ExamAttempt, Question
+from violations import MAX_VIOLATIONS, VIOLATION_PENALTIES
+
+UNANSWERED = -1
+
+def option_codes(column):
+    """SQL expression mapping A-D to 0-3 and anything else to UNANSWERED"""
+    return case(
+        *[(column == option, code) for code, option in enumerate(OPTIONS)],
+        else_=UNANSWERED
+    )
+
+def load_answer_key(exam_id):
+    """(question ids, correct option codes, marks) sorted by question id"""
+    rows = db.session.execute(
+        select(Question.id, option_codes(Question.correct_option), Question.marks)
+        .where(Question.exam_id == exam_id)
+        .order_by(Question.id)
+    ).all()
+    key = np.array(rows, dtype=np.int64).reshape(-1, 3)
+    return key[:, 0], key[:, 1].astype(np.int8), key[:, 2].astype(np.float64)
+
+def load_attempts(exam_id):
+    """(attempt ids, violation totals, current final marks) for submitted attempts"""
+    rows = db.session.execute(
+        select(ExamAttempt.id, ExamAttempt.cheating_count, ExamAttempt.final_marks)
+        .where(ExamAttempt.exam_id == exam_id, ExamAttempt.submitted == True)
+        .order_by(ExamAttempt.id)
+    ).all()
+    attempts = np.array([(r[0], r[1] or 0, r[2] or 0) for r in rows], dtype=np.float64).reshape(-1, 3)
+    return attempts[:, 0].astype(np.int64), attempts[:, 1].astype(np.int64), attempts[:, 2]
+
+def load_answer_matrix(exam_id, attempt_ids, question_ids, batch_size=200000):
+    """attempts x questions matrix of selected option codes (UNANSWERED if none)"""
+    matrix = np.full((len(attempt_ids), len(question_ids)), UNANSWERED, dtype=np.int8)
+    if not len(attempt_ids) or not len(question_ids):
+        return matrix
+    
+    stmt = (
+        select(Answer.attempt_id, Answer.question_id, option_codes(Answer.selected_option))
+        .join(ExamAttempt, ExamAttempt.id == Answer.attempt_id)
+        .where(ExamAttempt.exam_id == exam_id, ExamAttempt.submitted == True)
+    )
+    # Millions of int triples: read them straight off the DBAPI cursor, the
+    # ORM result layer costs more than everything else here combined
+    connection = db.session.connection()
+    # Only the exam id and option letters are bound, so literal binds are safe
+    sql = str(stmt.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute(sql)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            # fromiter over a flat int stream avoids numpy inspecting each row
+            chunk = np.fromiter(chain.from_iterable(rows), dtype=np.int64,
+                                count=3 * len(rows)).reshape(-1, 3)
+            attempt_rows = np.searchsorted(attempt_ids, chunk[:, 0])
+            cols = np.searchsorted(question_ids, chunk[:, 1])
+            # Drop answers of attempts submitted after attempt_ids was loaded,
+            # and answers to questions no longer on the exam
+            valid = ((attempt_rows < len(attempt_ids))
+                     & (attempt_ids[np.minimum(attempt_rows, len(attempt_ids) - 1)] == chunk[:, 0])
+                     & (cols < len(question_ids))
+                     & (question_ids[np.minimum(cols, len(question_ids) - 1)] == chunk[:, 1]))
+            matrix[attempt_rows[valid], cols[valid]] = chunk[valid, 2]
+    finally:
+        cursor.close()
+    return matrix
+
+def penalty_multipliers(violations):
+    """Vectorized form of violations.apply_violation_penalty"""
+    multipliers = np.ones(len(violations), dtype=np.float64)
+    for count, multiplier in VIOLATION_PENALTIES.items():
+        multipliers[violations == count] = multiplier
+    multipliers[violations >= MAX_VIOLATIONS] = 0.0
+    return multipliers
+
+def score(matrix, correct_options, marks, violations):
+    """Final marks for every attempt"""
+    correct = matrix == correct_options[np.newaxis, :]
+    return (correct @ marks) * penalty_multipliers(violations)
+
+def regrade_exam(exam_id):
+    """Regrade every submitted attempt of an exam against its current answer
+    key and write back final_marks and is_correct. Commits."""
+    question_ids, correct_options, marks = load_answer_key(exam_id)
+    attempt_ids, violations, old_marks = load_attempts(exam_id)
+    matrix = load_answer_matrix(exam_id, attempt_ids, question_ids)
+    new_marks = score(matrix, correct_options, marks, violations)
+    
+    changed = np.flatnonzero(~np.isclose(new_marks, old_marks))
+    if len(changed):
+        db.session.execute(
+            update(ExamAttempt),
+            [{'id': int(attempt_ids[i]), 'final_marks': float(new_marks[i])} for i in changed]
+        )
+    
+    # is_correct in one set-based statement, touching only rows that flip
+    correct_option = select(Question.correct_option).where(
+        Question.id == Answer.question_id
+    ).scalar_subquery()
+    submitted_attempts = select(ExamAttempt.id).where(
+        ExamAttempt.exam_id == exam_id, ExamAttempt.submitted == True
+    )
+    is_correct = func.coalesce(Answer.selected_option == correct_option, False)
+    db.session.execute(
+        update(Answer)
+        .where(Answer.attempt_id.in_(submitted_attempts), Answer.is_correct.is_distinct_from(is_correct))
+        .values(is_correct=is_correct),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.commit()
+    invalidate_dashboards(OVERVIEW, RESULTS)
+    
+    return {
+        'attempts': len(attempt_ids),
+        'questions': len(question_ids),
+        'changed': len(changed),
+        'mean_before': float(old_marks.mean()) if len(old_marks) else 0.0,
+        'mean_after': float(new_marks.mean()) if len(new_marks) else 0.0,
+    }
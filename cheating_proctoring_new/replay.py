@@ -0,0 +1,207 @@
+"""Offline replay of stored camera evidence against candidate detection settings.
+
+Frames stored in CameraLog are streamed in id order, re-analysed in a process
+pool with both the live settings (baseline) and a candidate, and the verdicts
+are tallied per attempt. The state file starts with the replay settings and
+gets one line per finished batch with that batch's tallies and last frame id,
+so checkpointing costs the same at the millionth frame as at the first and an
+interrupted run resumes where it stopped. Use it through
+`flask replay-camera-logs`.
+
+Only frames that were scored as violations are stored (CameraLog.image_data),
+so the replay can show violations a candidate would drop, but never a frame
+that passed and would now be flagged."""
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app
+from sqlalchemy import select
+
+from detection import detection_params, decode_frame, analyze_camera_frame, preload_detectors
+from extensions import db
+from models import CameraLog, ExamAttempt
+from violations import MAX_VIOLATIONS
+
+CLEAN = 'clean'
+UNDECODABLE = 'undecodable'
+
+# Set in each pool process by _init_worker
+_worker_params = {}
+
+def _init_worker(baseline, candidate):
+    _worker_params['baseline'] = baseline
+    _worker_params['candidate'] = candidate
+    preload_detectors()
+
+def _verdict(image, params):
+    result = analyze_camera_frame(image, params)
+    return result['violation_type'] if result['violation_detected'] else CLEAN
+
+def _replay_frame(image_data):
+    """(baseline verdict, candidate verdict) for one stored frame"""
+    try:
+        image = decode_frame(image_data)
+    except Exception:
+        image = None
+    if image is None:
+        return UNDECODABLE, UNDECODABLE
+    return _verdict(image, _worker_params['baseline']), _verdict(image, _worker_params['candidate'])
+
+def replay_camera_logs(candidate, state_path, batch_size=500, workers=None, exam_id=None, progress=None):
+    """Replay every stored frame (optionally for one exam) and return the report"""
+    baseline = detection_params(current_app.config['FACE_DETECTION'])
+    candidate = detection_params(candidate)
+    state = _load_state(state_path, baseline, candidate, exam_id)
+    
+    query = select(
+        CameraLog.id, CameraLog.attempt_id, CameraLog.student_id,
+        CameraLog.exam_id, CameraLog.event_type, CameraLog.image_data
+    ).where(CameraLog.image_data.isnot(None)).order_by(CameraLog.id).limit(batch_size)
+    if exam_id is not None:
+        query = query.where(CameraLog.exam_id == exam_id)
+    
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(baseline, candidate)) as pool:
+        while True:
+            rows = db.session.execute(query.where(CameraLog.id > state['last_id'])).all()
+            if not rows:
+                break
+            chunksize = max(1, len(rows) // (workers * 4))
+            verdicts = pool.map(_replay_frame, [row.image_data for row in rows], chunksize=chunksize)
+            batch = {'last_id': rows[-1].id, 'frames': 0, 'changed': 0, 'attempts': {}}
+            for row, (baseline_verdict, candidate_verdict) in zip(rows, verdicts):
+                _tally(batch, row, baseline_verdict, candidate_verdict)
+            _append_batch(state_path, batch)
+            _merge(state, batch)
+            # Release the batch's connection and image data before the next one
+            db.session.close()
+            if progress:
+                progress(state)
+    
+    return build_report(state)
+
+COUNTERS = ('frames', 'changed', 'baseline_violations', 'candidate_violations')
+
+def _new_tally(student_id, exam_id):
+    return dict({counter: 0 for counter in COUNTERS},
+                student_id=student_id, exam_id=exam_id, transitions={})
+
+def _tally(state, row, baseline_verdict, candidate_verdict):
+    state['frames'] += 1
+    attempt = state['attempts'].get(str(row.attempt_id))
+    if attempt is None:
+        attempt = state['attempts'][str(row.attempt_id)] = _new_tally(row.student_id, row.exam_id)
+    attempt['frames'] += 1
+    if baseline_verdict not in (CLEAN, UNDECODABLE):
+        attempt['baseline_violations'] += 1
+    if candidate_verdict not in (CLEAN, UNDECODABLE):
+        attempt['candidate_violations'] += 1
+    if baseline_verdict != candidate_verdict:
+        state['changed'] += 1
+        attempt['changed'] += 1
+        transition = f'{baseline_verdict} -> {candidate_verdict}'
+        attempt['transitions'][transition] = attempt['transitions'].get(transition, 0) + 1
+
+def _merge(state, batch):
+    """Add one batch's tallies to the running totals"""
+    state['last_id'] = batch['last_id']
+    state['frames'] += batch['frames']
+    state['changed'] += batch['changed']
+    for attempt_id, tally in batch['attempts'].items():
+        attempt = state['attempts'].get(attempt_id)
+        if attempt is None:
+            attempt = state['attempts'][attempt_id] = _new_tally(tally['student_id'], tally['exam_id'])
+        for counter in COUNTERS:
+            attempt[counter] += tally[counter]
+        for transition, count in tally['transitions'].items():
+            attempt['transitions'][transition] = attempt['transitions'].get(transition, 0) + count
+
+def build_report(state):
+    """Summarise the tallies per attempt and per student.
+
+    Termination is re-estimated by combining each attempt's tab switches with
+    its camera violations under each setting."""
+    tab_switches = _tab_switch_counts([int(a) for a in state['attempts']])
+    transitions = {}
+    per_attempt = []
+    per_student = {}
+    
+    for attempt_id, tally in state['attempts'].items():
+        tabs = tab_switches.get(int(attempt_id), 0)
+        terminated_before = tabs + tally['baseline_violations'] >= MAX_VIOLATIONS
+        terminated_after = tabs + tally['candidate_violations'] >= MAX_VIOLATIONS
+        for transition, count in tally['transitions'].items():
+            transitions[transition] = transitions.get(transition, 0) + count
+        
+        if tally['changed']:
+            per_attempt.append(dict(tally, attempt_id=int(attempt_id),
+                                    terminated_before=terminated_before,
+                                    terminated_after=terminated_after))
+        
+        student = per_student.setdefault(tally['student_id'], {
+            'student_id': tally['student_id'],
+            'frames': 0,
+            'changed': 0,
+            'attempts_changed': 0,
+            'termination_changes': 0,
+        })
+        student['frames'] += tally['frames']
+        student['changed'] += tally['changed']
+        student['attempts_changed'] += 1 if tally['changed'] else 0
+        student['termination_changes'] += 1 if terminated_before != terminated_after else 0
+    
+    return {
+        'baseline': state['baseline'],
+        'candidate': state['candidate'],
+        'exam_id': state['exam_id'],
+        'frames': state['frames'],
+        'changed': state['changed'],
+        'transitions': dict(sorted(transitions.items(), key=lambda t: -t[1])),
+        'attempts': sorted(per_attempt, key=lambda a: -a['changed']),
+        'students': sorted((s for s in per_student.values() if s['changed']), key=lambda s: -s['changed']),
+    }
+
+def _tab_switch_counts(attempt_ids, chunk=500):
+    counts = {}
+    for i in range(0, len(attempt_ids), chunk):
+        rows = db.session.execute(
+            select(ExamAttempt.id, ExamAttempt.tab_switch_count)
+            .where(ExamAttempt.id.in_(attempt_ids[i:i + chunk]))
+        ).all()
+        counts.update({row.id: row.tab_switch_count or 0 for row in rows})
+    return counts
+
+def _load_state(path, baseline, candidate, exam_id):
+    """Running totals rebuilt from the state file, which is created (with just
+    the settings line) if it doesn't exist yet"""
+    settings = {'baseline': baseline, 'candidate': candidate, 'exam_id': exam_id}
+    state = dict(settings, last_id=0, frames=0, changed=0, attempts={})
+    if not path:
+        return state
+    if not os.path.exists(path):
+        with open(path, 'w') as f:
+            f.write(json.dumps(settings) + '\n')
+        return state
+    
+    with open(path, 'rb') as f:
+        if json.loads(f.readline()) != settings:
+            raise ValueError(f'{path} belongs to a replay with different settings; '
+                             'use another --state file to start a new replay')
+        complete = f.tell()
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            _merge(state, json.loads(line))
+            complete += len(line)
+    # Drop a batch line cut short by a crash; that batch is replayed
+    os.truncate(path, complete)
+    return state
+
+def _append_batch(path, batch):
+    if not path:
+        return
+    with open(path, 'a') as f:
+        f.write(json.dumps(batch) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
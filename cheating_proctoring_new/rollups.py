@@ -0,0 +1,131 @@
+"""Per-exam, per-minute violation counts for heatmaps and timelines.
+
+Every CheatingLog/CameraLog insert also bumps its (exam, minute, source,
+event type) row here in the same transaction, so reading an exam's timeline
+touches a few hundred rollup rows however many raw events exist.
+backfill_rollups() rebuilds the table from the raw logs."""
+from collections import Counter
+from datetime import timedelta
+
+from sqlalchemy import delete, insert, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from extensions import db
+from models import CheatingLog, CameraLog, ViolationRollup
+
+CHEATING = 'cheating'
+CAMERA = 'camera'
+SOURCES = {
+    CHEATING: (CheatingLog, CheatingLog.cheat_type),
+    CAMERA: (CameraLog, CameraLog.event_type),
+}
+
+def minute_bucket(timestamp):
+    return timestamp.replace(second=0, microsecond=0)
+
+def record_violation(exam_id, source, event_type, timestamp):
+    """Count one logged event. Call next to the log insert; caller commits."""
+    if exam_id is None:
+        return
+    row = {
+        'exam_id': exam_id,
+        'bucket': minute_bucket(timestamp),
+        'source': source,
+        'event_type': event_type or 'unknown',
+        'event_count': 1,
+    }
+    
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        statement = dialect_insert(ViolationRollup).values(row)
+        db.session.execute(statement.on_conflict_do_update(
+            index_elements=['exam_id', 'bucket', 'source', 'event_type'],
+            set_={'event_count': ViolationRollup.event_count + statement.excluded.event_count}
+        ))
+        return
+    
+    # Generic fallback: bump the row, create it if this is the minute's first event
+    updated = db.session.execute(
+        update(ViolationRollup)
+        .where(ViolationRollup.exam_id == row['exam_id'],
+               ViolationRollup.bucket == row['bucket'],
+               ViolationRollup.source == source,
+               ViolationRollup.event_type == row['event_type'])
+        .values(event_count=ViolationRollup.event_count + 1)
+    ).rowcount
+    if not updated:
+        db.session.execute(insert(ViolationRollup).values(row))
+
+def backfill_rollups(exam_id=None, batch_size=10000):
+    """Rebuild rollups (for one exam, or all) from the raw logs. Commits.
+    Returns the number of rollup rows written.
+    
+    The old rows are deleted before the logs are read, and record_violation
+    in other transactions waits until the rebuild commits, so every event
+    is counted exactly once: by the scan if it committed first, else by its
+    own increment afterwards. Violations are held up for the whole run."""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        # Row locks alone would let a concurrent upsert insert a fresh row
+        db.session.execute(text(f'LOCK TABLE {ViolationRollup.__tablename__} IN SHARE ROW EXCLUSIVE MODE'))
+    # On SQLite the first write takes the database write lock
+    clear = delete(ViolationRollup)
+    if exam_id is not None:
+        clear = clear.where(ViolationRollup.exam_id == exam_id)
+    db.session.execute(clear)
+    
+    counts = Counter()
+    for source, (model, event_type) in SOURCES.items():
+        statement = select(model.exam_id, model.timestamp, event_type).where(
+            model.exam_id.isnot(None), model.timestamp.isnot(None)
+        )
+        if exam_id is not None:
+            statement = statement.where(model.exam_id == exam_id)
+        result = db.session.execute(statement.execution_options(yield_per=batch_size))
+        for partition in result.partitions():
+            for log_exam_id, timestamp, log_type in partition:
+                counts[(log_exam_id, minute_bucket(timestamp), source, log_type or 'unknown')] += 1
+    
+    if counts:
+        db.session.execute(insert(ViolationRollup), [
+            {'exam_id': key[0], 'bucket': key[1], 'source': key[2], 'event_type': key[3], 'event_count': count}
+            for key, count in counts.items()
+        ])
+    db.session.commit()
+    return len(counts)
+
+def violation_timeline(exam, bucket_minutes=1, source=None):
+    """Heatmap (bucket x event type) and timeline (total per bucket) for an
+    exam. Only buckets with events are listed; `minutes` gives each bucket's
+    offset from the exam start (starts_at, else the first event)."""
+    statement = select(
+        ViolationRollup.bucket, ViolationRollup.source,
+        ViolationRollup.event_type, ViolationRollup.event_count
+    ).where(ViolationRollup.exam_id == exam.id).order_by(ViolationRollup.bucket)
+    if source is not None:
+        statement = statement.where(ViolationRollup.source == source)
+    rows = db.session.execute(statement).all()
+    
+    first = rows[0].bucket if rows else None
+    origin = minute_bucket(exam.starts_at) if exam.starts_at and (first is None or exam.starts_at <= first) else first
+    event_types = sorted({f'{row.source}:{row.event_type}' for row in rows})
+    columns = {event_type: i for i, event_type in enumerate(event_types)}
+    
+    cells = {}
+    for row in rows:
+        index = int((row.bucket - origin).total_seconds() // 60) // bucket_minutes
+        counts = cells.setdefault(index, [0] * len(event_types))
+        counts[columns[f'{row.source}:{row.event_type}']] += row.event_count
+    indexes = sorted(cells)
+    
+    return {
+        'exam_id': exam.id,
+        'bucket_minutes': bucket_minutes,
+        'origin': origin.isoformat() if origin else None,
+        'event_types': event_types,
+        'buckets': [(origin + timedelta(minutes=i * bucket_minutes)).isoformat() for i in indexes],
+        'minutes': [i * bucket_minutes for i in indexes],
+        'heatmap': [cells[i] for i in indexes],
+        'timeline': [sum(cells[i]) for i in indexes],
+        'total': sum(row.event_count for row in rows),
+    }
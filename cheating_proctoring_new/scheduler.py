@@ -0,0 +1,56 @@
+"""Periodic background jobs, run inside each worker process.
+
+Jobs must be idempotent: every worker runs its own scheduler, so the same job
+can fire in several processes at roughly the same time."""
+import threading
+import time
+
+class Scheduler:
+    def __init__(self, app):
+        self.app = app
+        self._jobs = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_job(self, func, interval):
+        """Call func() inside an app context every `interval` seconds"""
+        self._jobs.append({'func': func, 'interval': interval, 'next_run': 0})
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def run_pending(self):
+        now = time.monotonic()
+        for job in self._jobs:
+            if job['next_run'] > now:
+                continue
+            job['next_run'] = now + job['interval']
+            with self.app.app_context():
+                try:
+                    job['func']()
+                except Exception as e:
+                    print(f"Scheduled job {job['func'].__name__} failed: {e}")
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.run_pending()
+            self._stop.wait(1)
+
+def start_scheduler(app):
+    """Start the app's background jobs in this process"""
+    from collusion import analyze_submitted_exams
+    from expiry import expire_overdue_attempts
+    from provisioning import provision_upcoming_exams
+    
+    scheduler = Scheduler(app)
+    scheduler.add_job(provision_upcoming_exams, app.config['SCHEDULER_INTERVAL_SECONDS'])
+    scheduler.add_job(analyze_submitted_exams, app.config['SCHEDULER_INTERVAL_SECONDS'])
+    scheduler.add_job(expire_overdue_attempts, app.config['SCHEDULER_INTERVAL_SECONDS'])
+    scheduler.start()
+    app.extensions['scheduler'] = scheduler
+    return scheduler
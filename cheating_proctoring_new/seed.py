@@ -0,0 +1,130 @@
+"""Database creation and demo data"""
+from sqlalchemy import inspect
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models import User, Exam, Question
+
+class StaleSchema(Exception):
+    """The database has tables from an older version of the models"""
+
+def missing_columns():
+    """'table.column' for model columns that existing tables lack. create_all
+    only creates missing tables, it never adds columns to existing ones."""
+    inspector = inspect(db.engine)
+    existing = set(inspector.get_table_names())
+    missing = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing:
+            continue
+        columns = {column['name'] for column in inspector.get_columns(table.name)}
+        missing.extend(f'{table.name}.{column.name}' for column in table.columns if column.name not in columns)
+    return missing
+
+def init_db(reset=False):
+    """Create the tables and demo accounts. Call inside an app context.
+    reset=True drops every table first; otherwise raises StaleSchema if the
+    existing tables predate the current models."""
+    if reset:
+        try:
+            db.drop_all()
+        except:
+            pass
+    
+    db.create_all()
+    missing = missing_columns()
+    if missing:
+        raise StaleSchema(f"Database schema is out of date (missing {', '.join(missing)}). "
+                          "Recreate it with `flask --app wsgi init-db --reset` (deletes all data).")
+    
+    print("🔄 Creating fresh database..." if reset else "🔄 Initializing database...")
+
+    # Create 25 students
+    for i in range(1, 26):
+        roll_number = f"500{i:02d}"
+        username = roll_number
+        password = f"{roll_number}@123"
+
+        if not User.query.filter_by(username=username).first():
+            student = User(
+                username=username,
+                password_hash=generate_password_hash(password),
+                role='student',
+                full_name=f"Student {roll_number}"
+            )
+            db.session.add(student)
+
+    # Create admin
+    if not User.query.filter_by(username='admin').first():
+        admin = User(
+            username='admin',
+            password_hash=generate_password_hash('admin'),
+            role='admin', 
+            full_name='System Administrator'
+        )
+        db.session.add(admin)
+
+    # Create teacher
+    if not User.query.filter_by(username='teacher1').first():
+        teacher = User(
+            username='teacher1',
+            password_hash=generate_password_hash('test123'),
+            role='teacher',
+            full_name='Demo Teacher'
+        )
+        db.session.add(teacher)
+
+    # Create sample GK exam
+    if not Exam.query.first():
+        exam = Exam(
+            title="General Knowledge Test",
+            duration_minutes=2,
+            total_questions=20,
+            created_by=1,
+            is_published=True
+        )
+        db.session.add(exam)
+        db.session.flush()
+
+        # Add sample GK questions
+        gk_questions = [
+            {"question": "What is the capital of France?", "options": ["London", "Berlin", "Paris", "Madrid"], "correct": "C"},
+            {"question": "Which planet is known as the Red Planet?", "options": ["Venus", "Mars", "Jupiter", "Saturn"], "correct": "B"},
+            {"question": "What is the largest ocean on Earth?", "options": ["Atlantic", "Indian", "Arctic", "Pacific"], "correct": "D"},
+            {"question": "Who wrote 'Romeo and Juliet'?", "options": ["Charles Dickens", "William Shakespeare", "Jane Austen", "Mark Twain"], "correct": "B"},
+            {"question": "What is the chemical symbol for gold?", "options": ["Go", "Gd", "Au", "Ag"], "correct": "C"},
+            {"question": "What is the largest mammal in the world?", "options": ["Elephant", "Blue Whale", "Giraffe", "Polar Bear"], "correct": "B"},
+            {"question": "Which country is known as the Land of the Rising Sun?", "options": ["China", "Japan", "Thailand", "South Korea"], "correct": "B"},
+            {"question": "What is the hardest natural substance on Earth?", "options": ["Gold", "Iron", "Diamond", "Platinum"], "correct": "C"},
+            {"question": "How many continents are there?", "options": ["5", "6", "7", "8"], "correct": "C"},
+            {"question": "What is the largest desert in the world?", "options": ["Sahara", "Gobi", "Arabian", "Antarctic"], "correct": "D"},
+            {"question": "Which element is essential for combustion?", "options": ["Nitrogen", "Oxygen", "Hydrogen", "Carbon Dioxide"], "correct": "B"},
+            {"question": "Who painted the Mona Lisa?", "options": ["Van Gogh", "Picasso", "Leonardo da Vinci", "Michelangelo"], "correct": "C"},
+            {"question": "What is the smallest country in the world?", "options": ["Monaco", "Vatican City", "San Marino", "Liechtenstein"], "correct": "B"},
+            {"question": "Which gas do plants absorb from the atmosphere?", "options": ["Oxygen", "Carbon Dioxide", "Nitrogen", "Hydrogen"], "correct": "B"},
+            {"question": "What is the currency of Japan?", "options": ["Yuan", "Won", "Yen", "Ringgit"], "correct": "C"},
+            {"question": "How many bones are in the human body?", "options": ["196", "206", "216", "226"], "correct": "B"},
+            {"question": "Which planet is known for its rings?", "options": ["Jupiter", "Saturn", "Uranus", "Neptune"], "correct": "B"},
+            {"question": "What is the main language of Brazil?", "options": ["Spanish", "Portuguese", "French", "English"], "correct": "B"},
+            {"question": "Who discovered penicillin?", "options": ["Marie Curie", "Alexander Fleming", "Louis Pasteur", "Robert Koch"], "correct": "B"},
+            {"question": "What is the speed of light?", "options": ["299,792 km/s", "300,000 km/s", "250,000 km/s", "350,000 km/s"], "correct": "A"}
+        ]
+
+        for q_data in gk_questions:
+            question = Question(
+                exam_id=exam.id,
+                question_text=q_data["question"],
+                option_a=q_data["options"][0],
+                option_b=q_data["options"][1],
+                option_c=q_data["options"][2],
+                option_d=q_data["options"][3],
+                correct_option=q_data["correct"],
+                marks=1
+            )
+            db.session.add(question)
+
+    db.session.commit()
+    print("✅ Database initialized successfully!")
+    print("👨‍🎓 Students: 50001@123 to 50025@123")
+    print("👨‍🏫 Teacher: teacher1/test123")
+    print("👨‍💼 Admin: admin/admin")
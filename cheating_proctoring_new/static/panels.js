@@ -0,0 +1,58 @@
+// Refresh dashboard panels in place instead of reloading the page.
+//
+// <div data-panel="/teacher/api/panels/counters" data-refresh="30">
+//     <h3 data-field="total_students">..</h3>     text from payload.total_students
+//     <tbody data-html="camera_html">..</tbody>   rendered rows from payload.camera_html
+// </div>
+//
+// Each panel remembers its ETag, so an unchanged panel costs a 304.
+(function () {
+    const etags = new WeakMap();
+
+    function applyPanel(panel, data) {
+        panel.querySelectorAll('[data-field]').forEach(node => {
+            if (data[node.dataset.field] !== undefined) {
+                node.textContent = data[node.dataset.field];
+            }
+        });
+        panel.querySelectorAll('[data-html]').forEach(node => {
+            if (data[node.dataset.html] !== undefined) {
+                node.innerHTML = data[node.dataset.html];
+            }
+        });
+        panel.dispatchEvent(new CustomEvent('panel:updated', {detail: data}));
+    }
+
+    function refreshPanel(panel) {
+        const url = panel.dataset.panel;
+        const etag = etags.get(panel);
+        const headers = etag && panel.dataset.etagUrl === url ? {'If-None-Match': etag} : {};
+        return fetch(url, {headers: headers, credentials: 'same-origin'})
+            .then(response => {
+                if (response.status === 304 || !response.ok) {
+                    return;
+                }
+                etags.set(panel, response.headers.get('ETag'));
+                panel.dataset.etagUrl = url;
+                return response.json().then(data => applyPanel(panel, data));
+            })
+            .catch(error => console.error('Panel refresh failed:', url, error));
+    }
+
+    function refreshPanels() {
+        return Promise.all(Array.from(document.querySelectorAll('[data-panel]')).map(refreshPanel));
+    }
+
+    document.addEventListener('DOMContentLoaded', () => {
+        document.querySelectorAll('[data-panel][data-refresh]').forEach(panel => {
+            setInterval(() => {
+                if (!document.hidden) {
+                    refreshPanel(panel);
+                }
+            }, parseInt(panel.dataset.refresh, 10) * 1000);
+        });
+    });
+
+    window.refreshPanel = refreshPanel;
+    window.refreshPanels = refreshPanels;
+})();
@@ -0,0 +1,67 @@
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from cache import cache
+from extensions import db
+from models import Answer, Exam, ExamAttempt, Question
+
+@pytest.fixture
+def app(tmp_path):
+    """App on a throwaway SQLite database, with an app context pushed"""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+    })
+    # The process-wide cache would otherwise carry entries between databases
+    cache.clear()
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+@pytest.fixture
+def make_exam(app):
+    """make_exam([(correct_option, marks), ...], duration_minutes=30)
+    -> (Exam, question ids in key order)"""
+    def make_exam(key, duration_minutes=30):
+        exam = Exam(title='Test Exam', duration_minutes=duration_minutes,
+                    total_questions=len(key), created_by=1, is_published=True)
+        db.session.add(exam)
+        db.session.flush()
+        questions = [
+            Question(exam_id=exam.id, question_text=f'Question {n}', option_a='A',
+                     option_b='B', option_c='C', option_d='D',
+                     correct_option=correct_option, marks=marks)
+            for n, (correct_option, marks) in enumerate(key)
+        ]
+        db.session.add_all(questions)
+        db.session.commit()
+        return exam, [q.id for q in questions]
+    return make_exam
+
+@pytest.fixture
+def make_attempt(app):
+    """make_attempt(exam, student_id, {question_id: option}, ...) -> ExamAttempt"""
+    def make_attempt(exam, student_id, answers=None, tab_switches=0, camera_warnings=0,
+                     start_time=None, submitted=False):
+        attempt = ExamAttempt(
+            exam_id=exam.id, student_id=student_id,
+            start_time=start_time or datetime.utcnow(), submitted=submitted,
+            tab_switch_count=tab_switches, camera_warning_count=camera_warnings,
+            cheating_count=tab_switches + camera_warnings
+        )
+        db.session.add(attempt)
+        db.session.flush()
+        db.session.add_all([
+            Answer(attempt_id=attempt.id, question_id=question_id, selected_option=option)
+            for question_id, option in (answers or {}).items()
+        ])
+        db.session.commit()
+        return attempt
+    return make_attempt
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from collusion import analyze_exam, collusion_params, find_similar_pairs, get_collusion_flags
+from models import CollusionFlag
+from regrade import UNANSWERED
+
+def brute_force_pairs(matrix, correct_options, params):
+    """find_similar_pairs one pair at a time, straight from the definitions"""
+    weight = params['wrong_answer_weight']
+    pairs = []
+    for i in range(len(matrix)):
+        for j in range(i + 1, len(matrix)):
+            both_answered = (matrix[i] != UNANSWERED) & (matrix[j] != UNANSWERED)
+            matching = both_answered & (matrix[i] == matrix[j])
+            shared_wrong = matching & (matrix[i] != correct_options)
+            b, m, w = int(both_answered.sum()), int(matching.sum()), int(shared_wrong.sum())
+            if not b:
+                continue
+            score = (m + (weight - 1) * w) / (b + (weight - 1) * w)
+            if score >= params['min_score'] and w >= params['min_shared_wrong']:
+                pairs.append((i, j, b, m, w, score))
+    return pairs
+
+def cohort(rng, students=60, questions=20, copies=10):
+    """Random answer sheets, the last `copies` copied from the first with a few changes"""
+    matrix = rng.integers(UNANSWERED, 4, size=(students, questions)).astype(np.int8)
+    for k in range(copies):
+        row = matrix[k].copy()
+        changed = rng.choice(questions, size=k % 3, replace=False)
+        row[changed] = rng.integers(0, 4, size=len(changed))
+        matrix[students - copies + k] = row
+    return matrix, rng.integers(0, 4, size=questions).astype(np.int8)
+
+def test_find_similar_pairs_matches_brute_force():
+    matrix, correct_options = cohort(np.random.default_rng(3))
+    # A small block size makes the copies land in other blocks than their originals
+    params = collusion_params({'block_size': 16})
+    
+    pairs = find_similar_pairs(matrix, correct_options, params)
+    expected = brute_force_pairs(matrix, correct_options, params)
+    
+    assert len(expected) >= 5
+    assert sorted(pair[:5] for pair in pairs) == sorted(pair[:5] for pair in expected)
+    assert sorted(pair[5] for pair in pairs) == pytest.approx(sorted(pair[5] for pair in expected))
+    assert [pair[5] for pair in pairs] == sorted((pair[5] for pair in pairs), reverse=True)
+
+def test_find_similar_pairs_keeps_the_top_max_flags():
+    matrix, correct_options = cohort(np.random.default_rng(3))
+    pairs = find_similar_pairs(matrix, correct_options, {'max_flags': 2})
+    assert pairs == find_similar_pairs(matrix, correct_options)[:2]
+
+def test_analyze_exam_only_reruns_for_new_submissions(make_exam, make_attempt):
+    exam, question_ids = make_exam([('A', 1)] * 8)
+    shared = dict(zip(question_ids, 'BBBBCCAA'))
+    make_attempt(exam, 1, shared, submitted=True)
+    make_attempt(exam, 2, shared, submitted=True)
+    make_attempt(exam, 3, dict(zip(question_ids, 'ABCDABCD')), submitted=True)
+    
+    assert analyze_exam(exam.id)
+    flags = CollusionFlag.query.filter_by(exam_id=exam.id).all()
+    assert [(f.student_a_id, f.student_b_id, f.shared_wrong) for f in flags] == [(1, 2, 6)]
+    assert not analyze_exam(exam.id)
+    
+    make_attempt(exam, 4, shared, submitted=True)
+    assert analyze_exam(exam.id)
+    assert CollusionFlag.query.filter_by(exam_id=exam.id).count() == 3
+
+def test_reading_flags_does_not_analyse(make_exam, make_attempt):
+    exam, question_ids = make_exam([('A', 1)] * 8)
+    shared = dict(zip(question_ids, 'BBBBCCAA'))
+    make_attempt(exam, 1, shared, submitted=True)
+    make_attempt(exam, 2, shared, submitted=True)
+    
+    assert get_collusion_flags(exam.id) == []
+    analyze_exam(exam.id)
+    assert [f['student_b_id'] for f in get_collusion_flags(exam.id)] == [2]
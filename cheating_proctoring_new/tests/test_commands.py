@@ -0,0 +1,14 @@
+import pytest
+
+@pytest.mark.parametrize('command', ['provision-exam', 'regrade-exam', 'detect-collusion'])
+def test_unknown_exam_is_a_usage_error(app, command):
+    result = app.test_cli_runner().invoke(args=[command, '999'])
+    assert result.exit_code == 2
+    assert 'no exam with id 999' in result.output
+
+def test_regrade_exam(app, make_exam, make_attempt):
+    exam, question_ids = make_exam([('A', 1)])
+    make_attempt(exam, 1, {question_ids[0]: 'A'}, submitted=True)
+    result = app.test_cli_runner().invoke(args=['regrade-exam', str(exam.id)])
+    assert result.exit_code == 0
+    assert '1 marks changed' in result.output
@@ -0,0 +1,16 @@
+import io
+
+from dashboards import student_result_rows
+from question_import import import_question_bank
+
+def test_result_row_follows_question_imports(app, make_exam, make_attempt):
+    # Panels are rebuilt every time; only the row fragments stay cached
+    app.config['DASHBOARD_CACHE_SECONDS'] = -1
+    exam, _ = make_exam([('A', 1)] * 5)
+    make_attempt(exam, 1, submitted=True)
+    assert '<td>5</td>' in student_result_rows(1)['html']
+    
+    bank = 'question_text,option_a,option_b,option_c,option_d,correct_option\n' + 'Q,A,B,C,D,A\n' * 3
+    import_question_bank(exam, io.BytesIO(bank.encode()), 'csv')
+    
+    assert '<td>8</td>' in student_result_rows(1)['html']
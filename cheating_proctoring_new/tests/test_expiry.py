@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from answers import finalize_attempt, finalize_attempts
+from extensions import db
+from expiry import expire_overdue_attempts
+from models import ExamAttempt
+
+NOW = datetime(2026, 1, 5, 12, 0)
+
+def test_sweeper_finalizes_each_overdue_attempt_once(make_exam, make_attempt):
+    exam, question_ids = make_exam([('A', 2), ('B', 2), ('C', 2)], duration_minutes=30)
+    overdue = make_attempt(exam, 1, {question_ids[0]: 'A', question_ids[1]: 'B'}, tab_switches=1,
+                           start_time=NOW - timedelta(minutes=40))
+    # Past the duration but still inside EXPIRY_GRACE_SECONDS
+    in_grace = make_attempt(exam, 2, {question_ids[2]: 'C'}, start_time=NOW - timedelta(minutes=31))
+    running = make_attempt(exam, 3, start_time=NOW - timedelta(minutes=10))
+    submitted = make_attempt(exam, 4, start_time=NOW - timedelta(hours=2), submitted=True)
+    not_started = ExamAttempt(exam_id=exam.id, student_id=5)
+    db.session.add(not_started)
+    db.session.commit()
+    
+    assert expire_overdue_attempts(NOW) == 1
+    assert expire_overdue_attempts(NOW) == 0
+    assert expire_overdue_attempts(NOW + timedelta(minutes=5)) == 1
+    
+    db.session.expire_all()
+    assert (overdue.submitted, overdue.end_time) == (True, NOW)
+    assert overdue.final_marks == 4 * 0.7
+    assert (in_grace.submitted, in_grace.final_marks) == (True, 2)
+    assert not running.submitted and not not_started.submitted
+    assert submitted.end_time is None
+
+def test_sweeper_claims_in_batches(app, make_exam, make_attempt):
+    app.config['EXPIRY_BATCH_SIZE'] = 2
+    exam, _ = make_exam([('A', 1)], duration_minutes=30)
+    for student_id in range(1, 6):
+        make_attempt(exam, student_id, start_time=NOW - timedelta(hours=1))
+    
+    assert expire_overdue_attempts(NOW) == 5
+    assert ExamAttempt.query.filter_by(submitted=False).count() == 0
+
+def test_finalized_attempt_is_not_finalized_again(make_exam, make_attempt):
+    exam, question_ids = make_exam([('A', 1)], duration_minutes=30)
+    attempt = make_attempt(exam, 1, {question_ids[0]: 'A'}, start_time=NOW - timedelta(hours=1))
+    expire_overdue_attempts(NOW)
+    
+    assert finalize_attempt(attempt.id) is None
+    assert finalize_attempts([attempt.id]) == {}
+    db.session.commit()
+    db.session.expire_all()
+    assert (attempt.end_time, attempt.final_marks) == (NOW, 1)
+
+def test_finalize_without_returning(monkeypatch, make_exam, make_attempt):
+    # Dialects without UPDATE ... RETURNING take the generic path
+    monkeypatch.setattr(db.engine.dialect, 'name', 'mysql')
+    exam, question_ids = make_exam([('A', 2)], duration_minutes=30)
+    attempt = make_attempt(exam, 1, {question_ids[0]: 'A'}, tab_switches=1)
+    done = make_attempt(exam, 2, submitted=True)
+    
+    assert finalize_attempts([attempt.id, done.id], NOW) == {attempt.id: pytest.approx(1.4)}
+    assert finalize_attempts([attempt.id], NOW) == {}
+    db.session.commit()
+    db.session.expire_all()
+    assert (attempt.submitted, attempt.end_time, attempt.cheating_count) == (True, NOW, 1)
+    assert done.end_time is None
+
+def test_submit_after_sweep_returns_conflict(app, make_exam, make_attempt):
+    exam, question_ids = make_exam([('A', 1)], duration_minutes=30)
+    attempt = make_attempt(exam, 1, {question_ids[0]: 'A'}, start_time=NOW - timedelta(hours=1))
+    expire_overdue_attempts(NOW)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session.update(student_logged_in=True, student_id=1, current_attempt_id=attempt.id)
+    
+    response = client.post('/api/submit_exam', json={'answers': []})
+    
+    assert response.status_code == 409
@@ -0,0 +1,38 @@
+import pytest
+
+from models import CheatingLog, ViolationRollup
+
+@pytest.fixture
+def proctored_client(app, make_exam, make_attempt):
+    """Test client logged in as a student with camera proctoring on"""
+    exam, _ = make_exam([('A', 1)])
+    attempt = make_attempt(exam, 1)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session.update(student_logged_in=True, student_id=1, current_attempt_id=attempt.id,
+                       camera_proctoring=True)
+    return client
+
+def heartbeat(face_count, **extra):
+    return dict({'face_count': face_count, 'frame_width': 320, 'frame_height': 240,
+                 'boxes': [[100, 60, 120, 120]], 'frame_hash': 'abc'}, **extra)
+
+def test_heartbeat_with_one_face(proctored_client, app):
+    app.config['HEARTBEAT_AUDIT_RATE'] = 0
+    
+    response = proctored_client.post('/api/proctoring/heartbeat', json=heartbeat(1))
+    
+    assert response.status_code == 200
+    assert response.json['upload_frame'] is False
+
+@pytest.mark.parametrize('face_count', [-1, 11, 10 ** 10])
+def test_heartbeat_rejects_implausible_face_counts(proctored_client, face_count):
+    response = proctored_client.post('/api/proctoring/heartbeat', json=heartbeat(face_count))
+    assert response.status_code == 400
+
+def test_focus_event_type_is_truncated(proctored_client):
+    response = proctored_client.post('/api/record_cheating', json={'type': 'x' * 10000})
+    
+    assert response.status_code == 200
+    assert [log.cheat_type for log in CheatingLog.query] == ['x' * 50]
+    assert [row.event_type for row in ViolationRollup.query] == ['x' * 50]
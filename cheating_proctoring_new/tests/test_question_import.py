@@ -0,0 +1,51 @@
+import io
+import json
+
+import pytest
+
+from question_import import JsonStream, read_rows, validate_rows, QuestionBankError
+
+def question(**overrides):
+    return dict({'question_text': 'Capital of France?', 'option_a': 'Paris', 'option_b': 'Rome',
+                 'option_c': 'Berlin', 'option_d': 'Madrid', 'correct_option': 'a'}, **overrides)
+
+def validate(document):
+    return validate_rows(read_rows(io.BytesIO(json.dumps(document).encode()), 'json'))
+
+def errors(document):
+    with pytest.raises(QuestionBankError) as e:
+        validate(document)
+    return e.value.errors
+
+@pytest.mark.parametrize('document', [
+    [question(), question(marks=2)],
+    {'version': 1, 'questions': [question(), question(marks=2)], 'source': {'name': 'x'}},
+])
+def test_json_banks_are_streamed_in_small_chunks(document, monkeypatch):
+    monkeypatch.setattr(JsonStream.__init__, '__defaults__', (3,))
+    assert [q['marks'] for q in validate(document)] == [1, 2]
+
+@pytest.mark.parametrize('document', [{'questions': 5}, 7, 'text', {'questions': {'a': 1}}])
+def test_json_of_the_wrong_shape_is_a_validation_error(document):
+    assert errors(document) == [(0, 'expected a list of questions or {"questions": [...]}')]
+
+def test_list_of_non_objects_is_a_validation_error():
+    assert errors([1, question()]) == [(1, 'expected an object')]
+
+@pytest.mark.parametrize('marks', [1.5, '2.5', 0, True, 'two'])
+def test_marks_must_be_positive_whole_numbers(marks):
+    assert errors([question(marks=marks)]) == [(1, 'marks must be a positive whole number')]
+
+def test_whole_number_marks_given_as_floats_are_accepted():
+    assert [q['marks'] for q in validate([question(marks=3.0), question(marks='4')])] == [3, 4]
+
+def test_long_options_are_validation_errors():
+    assert errors([question(option_b='x' * 256, question_text='y' * 5000)]) == [
+        (1, 'option_b is longer than 255 characters')
+    ]
+
+def test_truncated_json_is_reported():
+    rows = read_rows(io.BytesIO(b'[{"question_text": "Q"},'), 'json')
+    with pytest.raises(QuestionBankError) as e:
+        validate_rows(rows)
+    assert e.value.errors[-1][1].startswith('unreadable file: invalid JSON')
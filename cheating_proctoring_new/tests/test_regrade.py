@@ -0,0 +1,97 @@
+import random
+
+import numpy as np
+import pytest
+
+import regrade
+from answers import finalize_attempt, grade_stored_answers, OPTIONS
+from extensions import db
+from models import Answer, ExamAttempt, Question
+from regrade import load_answer_key, load_answer_matrix, penalty_multipliers, regrade_exam, UNANSWERED
+from violations import apply_violation_penalty, get_violation_store
+
+def shift_key(question_ids):
+    """Move the correct option of each question on by one and add a mark"""
+    for question in Question.query.filter(Question.id.in_(question_ids)):
+        question.correct_option = OPTIONS[(OPTIONS.index(question.correct_option) + 1) % len(OPTIONS)]
+        question.marks += 1
+    db.session.commit()
+
+def per_attempt_marks(attempt_id):
+    """Final marks the way submit computes them for a single attempt"""
+    counts = get_violation_store().get(attempt_id)
+    return apply_violation_penalty(grade_stored_answers(attempt_id), counts.total)
+
+def test_penalty_multipliers_match_penalty_tiers():
+    violations = np.arange(6)
+    expected = [apply_violation_penalty(1.0, int(v)) for v in violations]
+    assert penalty_multipliers(violations).tolist() == pytest.approx(expected)
+
+def test_regrade_matches_per_attempt_grading(make_exam, make_attempt):
+    rng = random.Random(7)
+    exam, question_ids = make_exam([(rng.choice(OPTIONS), rng.randint(1, 3)) for _ in range(15)])
+    attempt_ids = []
+    for student_id in range(1, 41):
+        answers = {q: rng.choice(OPTIONS) for q in question_ids if rng.random() < 0.8}
+        attempt = make_attempt(exam, student_id, answers, tab_switches=rng.randint(0, 2),
+                               camera_warnings=rng.randint(0, 1))
+        finalize_attempt(attempt.id)
+        db.session.commit()
+        attempt_ids.append(attempt.id)
+    shift_key(question_ids[:5])
+    
+    result = regrade_exam(exam.id)
+    
+    assert result['attempts'] == 40
+    assert result['changed'] > 0
+    regraded = dict(db.session.query(ExamAttempt.id, ExamAttempt.final_marks))
+    is_correct = dict(db.session.query(Answer.id, Answer.is_correct))
+    for attempt_id in attempt_ids:
+        assert regraded[attempt_id] == pytest.approx(per_attempt_marks(attempt_id))
+    db.session.commit()
+    # Per-attempt grading recomputed is_correct; regrade had already got it right
+    assert dict(db.session.query(Answer.id, Answer.is_correct)) == is_correct
+
+def test_answer_matrix_ignores_unknown_attempts_and_questions(make_exam, make_attempt):
+    exam, question_ids = make_exam([('A', 1), ('B', 1), ('C', 1)])
+    attempts = [
+        make_attempt(exam, 1, {question_ids[0]: 'A', question_ids[2]: 'D'}, submitted=True),
+        make_attempt(exam, 2, {question_ids[1]: 'B'}, submitted=True),
+        make_attempt(exam, 3, {question_ids[0]: 'C'}, submitted=True),
+    ]
+    key_ids, _, _ = load_answer_key(exam.id)
+    
+    # The first and last attempts were not loaded, nor was the last question
+    matrix = load_answer_matrix(exam.id, np.array([attempts[1].id]), key_ids[:2])
+    
+    assert matrix.tolist() == [[UNANSWERED, OPTIONS.index('B')]]
+
+def test_submission_during_regrade_keeps_its_own_grade(make_exam, make_attempt, monkeypatch):
+    exam, question_ids = make_exam([('A', 1)] * 4)
+    all_a = {q: 'A' for q in question_ids}
+    all_b = {q: 'B' for q in question_ids}
+    # Attempt ids on both sides of the ones being regraded
+    late_low = make_attempt(exam, 1, all_a)
+    early = [make_attempt(exam, student_id, all_b) for student_id in (2, 3)]
+    late_high = make_attempt(exam, 4, all_a)
+    for attempt in early:
+        finalize_attempt(attempt.id)
+    db.session.commit()
+    shift_key(question_ids)
+    
+    late_marks = {}
+    load_attempts = regrade.load_attempts
+    def submit_while_loading(exam_id):
+        loaded = load_attempts(exam_id)
+        for attempt in (late_low, late_high):
+            late_marks[attempt.id], _ = finalize_attempt(attempt.id)
+        db.session.commit()
+        return loaded
+    monkeypatch.setattr(regrade, 'load_attempts', submit_while_loading)
+    
+    result = regrade_exam(exam.id)
+    
+    assert result['attempts'] == 2
+    final_marks = dict(db.session.query(ExamAttempt.id, ExamAttempt.final_marks))
+    assert [final_marks[attempt.id] for attempt in early] == [8, 8]
+    assert {attempt_id: final_marks[attempt_id] for attempt_id in late_marks} == late_marks
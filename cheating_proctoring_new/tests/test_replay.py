@@ -0,0 +1,50 @@
+import base64
+import json
+
+import cv2
+import numpy as np
+import pytest
+
+from extensions import db
+from models import CameraLog
+from replay import replay_camera_logs
+
+BLANK_FRAME = base64.b64encode(cv2.imencode('.jpg', np.zeros((240, 320, 3), np.uint8))[1]).decode()
+
+@pytest.fixture
+def camera_logs(app):
+    db.session.add_all([
+        CameraLog(student_id=attempt_id, exam_id=1, attempt_id=attempt_id, event_type='no_face_detected',
+                  image_data=BLANK_FRAME if n % 2 else 'not a jpeg')
+        for n, attempt_id in enumerate([1, 1, 2, 2, 3])
+    ])
+    db.session.commit()
+
+def replay(state_path, progress=None):
+    return replay_camera_logs({'min_neighbors': 4}, str(state_path), batch_size=2, workers=1,
+                              progress=progress)
+
+def test_interrupted_replay_resumes(camera_logs, tmp_path):
+    expected = replay(tmp_path / 'full.json')
+    state_path = tmp_path / 'state.json'
+    def interrupt(state):
+        raise KeyboardInterrupt
+    with pytest.raises(KeyboardInterrupt):
+        replay(state_path, interrupt)
+    # A crash in the middle of writing the next batch's line
+    with open(state_path, 'a') as f:
+        f.write('{"last_id": 4, "fra')
+    
+    report = replay(state_path)
+    
+    assert report == expected
+    assert report['frames'] == 5
+    lines = state_path.read_text().splitlines()
+    # The settings, then one line per batch of 2
+    assert len(lines) == 4
+    assert [json.loads(line)['last_id'] for line in lines[1:]] == [2, 4, 5]
+
+def test_state_from_other_settings_is_refused(camera_logs, tmp_path):
+    replay(tmp_path / 'state.json')
+    with pytest.raises(ValueError):
+        replay_camera_logs({'min_neighbors': 9}, str(tmp_path / 'state.json'), batch_size=2, workers=1)
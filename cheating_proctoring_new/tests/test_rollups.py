@@ -0,0 +1,58 @@
+import threading
+import time
+from datetime import datetime
+
+import rollups
+from extensions import db
+from models import CheatingLog, ViolationRollup
+from rollups import backfill_rollups, record_violation, CHEATING
+
+T0 = datetime(2026, 1, 5, 12, 0, 30)
+
+def log_violation(exam_id, cheat_type='tab_switch', timestamp=T0):
+    db.session.add(CheatingLog(student_id=1, exam_id=exam_id, attempt_id=1,
+                               cheat_type=cheat_type, timestamp=timestamp))
+    record_violation(exam_id, CHEATING, cheat_type, timestamp)
+
+def rollup_total(exam_id):
+    return sum(row.event_count for row in ViolationRollup.query.filter_by(exam_id=exam_id))
+
+def test_backfill_rebuilds_counts_from_logs(app):
+    for _ in range(3):
+        log_violation(1)
+    log_violation(1, 'window_blur')
+    log_violation(2)
+    db.session.commit()
+    db.session.query(ViolationRollup).delete()
+    db.session.commit()
+    
+    assert backfill_rollups(exam_id=1) == 2
+    assert rollup_total(1) == 4
+    assert rollup_total(2) == 0
+
+def test_violation_during_backfill_is_counted_once(app, monkeypatch):
+    log_violation(1)
+    db.session.commit()
+    
+    # Record a violation from another thread while the backfill is scanning
+    scanning = threading.Event()
+    minute_bucket = rollups.minute_bucket
+    def slow_minute_bucket(timestamp):
+        scanning.set()
+        time.sleep(0.5)
+        return minute_bucket(timestamp)
+    monkeypatch.setattr(rollups, 'minute_bucket', slow_minute_bucket)
+    
+    def violate():
+        scanning.wait()
+        with app.app_context():
+            log_violation(1, timestamp=T0.replace(second=40))
+            db.session.commit()
+    thread = threading.Thread(target=violate)
+    thread.start()
+    backfill_rollups()
+    thread.join()
+    
+    db.session.expire_all()
+    assert CheatingLog.query.count() == 2
+    assert rollup_total(1) == 2
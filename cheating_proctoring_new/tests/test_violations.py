@@ -0,0 +1,42 @@
+import pytest
+
+from extensions import db
+from models import CheatingLog, ExamAttempt
+from violations import (apply_violation_penalty, DatabaseViolationStore, LocalViolationStore,
+                        record_focus_violation, MAX_VIOLATIONS)
+
+@pytest.mark.parametrize('violations, expected', [(0, 10), (1, 7), (2, 3), (3, 0), (5, 0)])
+def test_apply_violation_penalty(violations, expected):
+    assert apply_violation_penalty(10, violations) == pytest.approx(expected)
+
+@pytest.mark.parametrize('store_class', [DatabaseViolationStore, LocalViolationStore])
+def test_limit_is_crossed_exactly_once(make_exam, make_attempt, store_class):
+    exam, _ = make_exam([('A', 1)])
+    attempt = make_attempt(exam, 1, camera_warnings=1)
+    store = store_class()
+    
+    counts = [store.increment(attempt.id, 'tab_switch') for _ in range(MAX_VIOLATIONS)]
+    db.session.commit()
+    
+    assert [c.total for c in counts] == [2, 3, 4]
+    assert [c.crossed_limit for c in counts] == [False, True, False]
+    assert store.get(attempt.id).limit_reached
+    # Both stores leave the combined count on the row for dashboards and regrade
+    db.session.expire_all()
+    assert (attempt.tab_switch_count, attempt.camera_warning_count, attempt.cheating_count) == (3, 1, 4)
+
+def test_focus_violations_terminate_at_the_limit(make_exam, make_attempt):
+    exam, _ = make_exam([('A', 1)])
+    attempt = make_attempt(exam, 1)
+    
+    for _ in range(MAX_VIOLATIONS - 1):
+        record_focus_violation(attempt, 'tab_switch')
+    db.session.commit()
+    assert not attempt.terminated
+    
+    counts = record_focus_violation(attempt, 'window_blur')
+    db.session.commit()
+    
+    assert counts.limit_reached and attempt.terminated
+    assert CheatingLog.query.filter_by(attempt_id=attempt.id).count() == MAX_VIOLATIONS
+    assert db.session.get(ExamAttempt, attempt.id).cheating_count == MAX_VIOLATIONS
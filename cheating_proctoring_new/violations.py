@@ -0,0 +1,150 @@
+"""Authoritative per-attempt violation counters"""
+from datetime import datetime
+import threading
+
+from flask import current_app
+from sqlalchemy import update
+
+from extensions import db
+from models import ExamAttempt, CheatingLog
+from rollups import record_violation, CHEATING
+
+MAX_VIOLATIONS = 3
+
+class ViolationCounts:
+    """Snapshot of an attempt's violation counters"""
+    def __init__(self, tab_switches=0, camera_warnings=0, crossed_limit=False):
+        self.tab_switches = tab_switches
+        self.camera_warnings = camera_warnings
+        # True only for the single increment that reached MAX_VIOLATIONS
+        self.crossed_limit = crossed_limit
+
+    @property
+    def total(self):
+        return self.tab_switches + self.camera_warnings
+
+    @property
+    def limit_reached(self):
+        return self.total >= MAX_VIOLATIONS
+
+class DatabaseViolationStore:
+    """Counters live on the ExamAttempt row and are bumped with a single UPDATE,
+    so concurrent requests from any worker serialize on the row lock"""
+    columns = {
+        'tab_switch': ExamAttempt.tab_switch_count,
+        'camera': ExamAttempt.camera_warning_count,
+    }
+
+    def increment(self, attempt_id, kind):
+        column = self.columns[kind]
+        db.session.execute(
+            update(ExamAttempt)
+            .where(ExamAttempt.id == attempt_id)
+            .values({
+                column: column + 1,
+                ExamAttempt.cheating_count: ExamAttempt.cheating_count + 1
+            })
+        )
+        counts = self.get(attempt_id)
+        counts.crossed_limit = counts.total == MAX_VIOLATIONS
+        return counts
+
+    def get(self, attempt_id):
+        row = db.session.execute(
+            db.select(ExamAttempt.tab_switch_count, ExamAttempt.camera_warning_count)
+            .where(ExamAttempt.id == attempt_id)
+        ).first()
+        if not row:
+            return ViolationCounts()
+        return ViolationCounts(row.tab_switch_count or 0, row.camera_warning_count or 0)
+
+    def discard(self, attempt_id):
+        pass
+
+class LocalViolationStore:
+    """In-process stand-in for a shared counter service. Counters are written
+    through to the ExamAttempt row so dashboards still see them."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def increment(self, attempt_id, kind):
+        seeded = self._load(attempt_id)
+        with self._lock:
+            tab_switches, camera_warnings = self._counts.get(attempt_id, seeded)
+            if kind == 'tab_switch':
+                tab_switches += 1
+            else:
+                camera_warnings += 1
+            self._counts[attempt_id] = (tab_switches, camera_warnings)
+
+        counts = ViolationCounts(tab_switches, camera_warnings)
+        counts.crossed_limit = counts.total == MAX_VIOLATIONS
+        # Guard on the stored total so an out-of-order write never goes backwards
+        db.session.execute(
+            update(ExamAttempt)
+            .where(ExamAttempt.id == attempt_id, ExamAttempt.cheating_count < counts.total)
+            .values(tab_switch_count=tab_switches,
+                    camera_warning_count=camera_warnings,
+                    cheating_count=counts.total)
+        )
+        return counts
+
+    def get(self, attempt_id):
+        tab_switches, camera_warnings = self._load(attempt_id)
+        return ViolationCounts(tab_switches, camera_warnings)
+
+    def discard(self, attempt_id):
+        with self._lock:
+            self._counts.pop(attempt_id, None)
+
+    def _load(self, attempt_id):
+        with self._lock:
+            if attempt_id in self._counts:
+                return self._counts[attempt_id]
+        # Seed from the database outside the lock (e.g. after a restart)
+        stored = DatabaseViolationStore().get(attempt_id)
+        with self._lock:
+            return self._counts.setdefault(
+                attempt_id, (stored.tab_switches, stored.camera_warnings)
+            )
+
+violation_stores = {
+    'database': DatabaseViolationStore,
+    'local': LocalViolationStore,
+}
+
+def get_violation_store():
+    """Return the counter store configured for the current app"""
+    return current_app.extensions['violation_store']
+
+def record_focus_violation(attempt, cheat_type):
+    """Count and log a tab/focus violation, marking the attempt terminated when
+    it reaches the limit (cheating + camera). Caller commits."""
+    counts = get_violation_store().increment(attempt.id, 'tab_switch')
+    cheat_log = CheatingLog(
+        student_id=attempt.student_id,
+        exam_id=attempt.exam_id,
+        attempt_id=attempt.id,
+        cheat_type=cheat_type,
+        timestamp=datetime.utcnow()
+    )
+    db.session.add(cheat_log)
+    record_violation(attempt.exam_id, CHEATING, cheat_type, cheat_log.timestamp)
+    if counts.crossed_limit:
+        attempt.terminated = True
+    return counts
+
+# Score multiplier by combined violation count; MAX_VIOLATIONS or more scores 0
+VIOLATION_PENALTIES = {
+    1: 0.7,  # 30% penalty
+    2: 0.3,  # 70% penalty
+}
+
+def apply_violation_penalty(total_marks, total_violations):
+    """Apply the penalty tiers for the combined violation count"""
+    if total_violations >= MAX_VIOLATIONS:
+        return 0
+    elif total_violations in VIOLATION_PENALTIES:
+        return total_marks * VIOLATION_PENALTIES[total_violations]
+    return total_marks
@@ -0,0 +1,10 @@
+"""Production entry point for a pre-fork WSGI server, e.g.
+
+    flask --app wsgi init-db
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Importing this module has no side effects beyond building the app; create the
+database once with `init-db` before starting the workers."""
+from app import create_app
+
+app = create_app()